@@ -46,6 +46,39 @@ macro_rules! impl_polysynth {
                     ]
                 }
 
+                pub fn voice_notes_cutoffs(&self) -> ([u8; $N_VOICES], [u8; $N_VOICES]) {
+                    // Same as voice_notes() and voice_cutoffs(), but each
+                    // voice register is only read once.
+                    let mut notes = [0u8; $N_VOICES];
+                    let mut cutoffs = [0u8; $N_VOICES];
+                    let v = self.registers.voices0().read();
+                    notes[0] = v.note().bits();
+                    cutoffs[0] = v.cutoff().bits();
+                    let v = self.registers.voices1().read();
+                    notes[1] = v.note().bits();
+                    cutoffs[1] = v.cutoff().bits();
+                    let v = self.registers.voices2().read();
+                    notes[2] = v.note().bits();
+                    cutoffs[2] = v.cutoff().bits();
+                    let v = self.registers.voices3().read();
+                    notes[3] = v.note().bits();
+                    cutoffs[3] = v.cutoff().bits();
+                    let v = self.registers.voices4().read();
+                    notes[4] = v.note().bits();
+                    cutoffs[4] = v.cutoff().bits();
+                    let v = self.registers.voices5().read();
+                    notes[5] = v.note().bits();
+                    cutoffs[5] = v.cutoff().bits();
+                    let v = self.registers.voices6().read();
+                    notes[6] = v.note().bits();
+                    cutoffs[6] = v.cutoff().bits();
+                    let v = self.registers.voices7().read();
+                    notes[7] = v.note().bits();
+                    cutoffs[7] = v.cutoff().bits();
+                    // TODO: proper register block. Add them yourself :)
+                    (notes, cutoffs)
+                }
+
                 pub fn set_matrix_coefficient(&mut self, o_x: u32, i_y: u32, value: i32)  {
                     // TODO: statically verify x_o, y_i both < 16. Should be true for any normal use case
                     // as matrices larger than this won't be able to process things at audio rate.
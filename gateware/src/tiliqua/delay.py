@@ -102,12 +102,17 @@ class Diffuser(wiring.Component):
 
     Delay lines are created external to this component, and may be
     SRAM-backed or PSRAM-backed depending on the application.
+
+    With :py:`use_hadamard`, the matrix mixer coefficients are fixed at
+    elaboration time and only made of shifts and adds (no multiplier, no
+    coefficient memory). The feedback paths are then shuffled by a scaled
+    4x4 Hadamard matrix instead, and :py:`matrix_mix` has no `c` stream.
     """
 
     i: In(stream.Signature(data.ArrayLayout(ASQ, 4)))
     o: Out(stream.Signature(data.ArrayLayout(ASQ, 4)))
 
-    def __init__(self, delay_lines, delays=None):
+    def __init__(self, delay_lines, delays=None, use_hadamard=False):
         super().__init__()
 
         if delays is None:
@@ -138,17 +143,34 @@ class Diffuser(wiring.Component):
         # [delay -> out] [delay -> delay] <- feedback
         #
 
-        self.matrix_mix = dsp.MatrixMix(
-            i_channels=8, o_channels=8,
-            coefficients=[[0.6, 0.0, 0.0, 0.0, 0.8, 0.0, 0.0, 0.0], # in0
-                          [0.0, 0.6, 0.0, 0.0, 0.0, 0.8, 0.0, 0.0], #  |
-                          [0.0, 0.0, 0.6, 0.0, 0.0, 0.0, 0.8, 0.0], #  |
-                          [0.0, 0.0, 0.0, 0.6, 0.0, 0.0, 0.0, 0.8], # in3
-                          [0.4, 0.0, 0.0, 0.0, 0.4,-0.4,-0.4,-0.4], # ds0
-                          [0.0, 0.4, 0.0, 0.0,-0.4, 0.4,-0.4,-0.4], #  |
-                          [0.0, 0.0, 0.4, 0.0,-0.4,-0.4, 0.4,-0.4], #  |
-                          [0.0, 0.0, 0.0, 0.4,-0.4,-0.4,-0.4, 0.4]])# ds3
-                          # out0 ------- out3  sw0 ---------- sw3
+        if use_hadamard:
+            # Every coefficient is a sum of at most 2 powers of two. The
+            # Hadamard matrix H/2 is orthogonal, so 0.375*H = 0.75*(H/2)
+            # decays by 0.75 on each pass through the delay lines.
+            h = 0.375
+            self.matrix_mix = dsp.MatrixMixConst(
+                i_channels=8, o_channels=8,
+                coefficients=[[0.5, 0.0, 0.0, 0.0,0.75, 0.0, 0.0, 0.0], # in0
+                              [0.0, 0.5, 0.0, 0.0, 0.0,0.75, 0.0, 0.0], #  |
+                              [0.0, 0.0, 0.5, 0.0, 0.0, 0.0,0.75, 0.0], #  |
+                              [0.0, 0.0, 0.0, 0.5, 0.0, 0.0, 0.0,0.75], # in3
+                              [0.5, 0.0, 0.0, 0.0,   h,   h,   h,   h], # ds0
+                              [0.0, 0.5, 0.0, 0.0,   h,  -h,   h,  -h], #  |
+                              [0.0, 0.0, 0.5, 0.0,   h,   h,  -h,  -h], #  |
+                              [0.0, 0.0, 0.0, 0.5,   h,  -h,  -h,   h]])# ds3
+                              # out0 ------- out3  sw0 ---------- sw3
+        else:
+            self.matrix_mix = dsp.MatrixMix(
+                i_channels=8, o_channels=8,
+                coefficients=[[0.6, 0.0, 0.0, 0.0, 0.8, 0.0, 0.0, 0.0], # in0
+                              [0.0, 0.6, 0.0, 0.0, 0.0, 0.8, 0.0, 0.0], #  |
+                              [0.0, 0.0, 0.6, 0.0, 0.0, 0.0, 0.8, 0.0], #  |
+                              [0.0, 0.0, 0.0, 0.6, 0.0, 0.0, 0.0, 0.8], # in3
+                              [0.4, 0.0, 0.0, 0.0, 0.4,-0.4,-0.4,-0.4], # ds0
+                              [0.0, 0.4, 0.0, 0.0,-0.4, 0.4,-0.4,-0.4], #  |
+                              [0.0, 0.0, 0.4, 0.0,-0.4,-0.4, 0.4,-0.4], #  |
+                              [0.0, 0.0, 0.0, 0.4,-0.4,-0.4,-0.4, 0.4]])# ds3
+                              # out0 ------- out3  sw0 ---------- sw3
 
     def elaborate(self, platform):
         m = Module()
@@ -164,7 +186,19 @@ class Diffuser(wiring.Component):
         wiring.connect(m, wiring.flipped(self.i), split4.i)
 
         # matrix <-> independent streams
-        wiring.connect(m, matrix_mix.o, split8.i)
+        if isinstance(matrix_mix, dsp.MatrixMixConst):
+            # The constant matrix is combinatorial, register its output so
+            # the feedback loop through the delay lines stays registered.
+            m.submodules.skid = skid = dsp.SkidBuffer(
+                width=data.ArrayLayout(ASQ, 8).as_shape().width)
+            dsp.connect_remap(m, matrix_mix.o, skid.w_stream, lambda o, i : [
+                i.payload.eq(o.payload.as_value())
+            ])
+            dsp.connect_remap(m, skid.r_stream, split8.i, lambda o, i : [
+                i.payload.eq(o.payload)
+            ])
+        else:
+            wiring.connect(m, matrix_mix.o, split8.i)
         dsp.connect_feedback_kick(m, merge8.o, matrix_mix.i)
 
         for n in range(4):
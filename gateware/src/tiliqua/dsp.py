@@ -14,6 +14,8 @@ from amaranth.lib.fifo     import SyncFIFOBuffered, AsyncFIFOBuffered
 from amaranth.lib.memory   import Memory
 from amaranth.utils        import exact_log2, ceil_log2
 
+import numpy as np
+
 from scipy import signal
 
 from amaranth_future       import fixed
@@ -253,19 +255,48 @@ class GainVCA(wiring.Component):
         (multiplier that may be >1 for saturation. legal values :py:`-3 < gain < 3`)
     o : :py:`Out(stream.Signature(ASQ))`
         Output stream, :py:`x * gain` with saturation.
+
+    The multiplication is performed by :py:`macp`, so this core is not
+    combinatorial: each sample passes through a small FSM and appears on
+    :py:`o` 2 cycles after it is accepted for a :py:`mac.MuxMAC` (the default),
+    or after the ring latency for a :py:`mac.RingMAC`. Full precision of
+    :py:`x` and :py:`gain` is kept, as :py:`|x * gain| < 3` fits in the
+    MAC's native type.
     """
 
-    i: In(stream.Signature(data.StructLayout({
-            "x": ASQ,
-            "gain": fixed.SQ(2, ASQ.f_width), # only 2 extra bits, so -3 to +3 is OK
-        })))
-    o: Out(stream.Signature(ASQ))
+    def __init__(self, macp=None):
+        self.macp = macp or mac.MAC.default()
+        super().__init__({
+            "i": In(stream.Signature(data.StructLayout({
+                "x": ASQ,
+                "gain": fixed.SQ(2, ASQ.f_width), # only 2 extra bits, so -3 to +3 is OK
+            }))),
+            "o": Out(stream.Signature(ASQ)),
+        })
 
     def elaborate(self, platform):
         m = Module()
 
-        result = Signal(fixed.SQ(3, ASQ.f_width))
-        m.d.comb += result.eq(self.i.payload.x * self.i.payload.gain)
+        m.submodules.macp = mp = self.macp
+
+        result = Signal(mac.SQNative)
+
+        with m.FSM() as fsm:
+
+            with m.State('WAIT-VALID'):
+                m.d.comb += self.i.ready.eq(1),
+                with m.If(self.i.valid):
+                   m.next = 'MAC'
+
+            with m.State('MAC'):
+                with mp.Multiply(m, a=self.i.payload.x, b=self.i.payload.gain):
+                    m.d.sync += result.eq(mp.z)
+                    m.next = 'WAIT-READY'
+
+            with m.State('WAIT-READY'):
+                m.d.comb += self.o.valid.eq(1),
+                with m.If(self.o.ready):
+                    m.next = 'WAIT-VALID'
 
         sat_hi = fixed.Const(0, shape=ASQ)
         sat_hi._value = 2**ASQ.f_width - 1 # move to Const.max()?
@@ -278,11 +309,6 @@ class GainVCA(wiring.Component):
         with m.Else():
             m.d.comb += self.o.payload.eq(result),
 
-        m.d.comb += [
-            self.o.valid.eq(self.i.valid),
-            self.i.ready.eq(self.o.ready),
-        ]
-
         return m
 
 class SawNCO(wiring.Component):
@@ -331,6 +357,89 @@ class SawNCO(wiring.Component):
 
         return m
 
+class SawNCOBank(wiring.Component):
+    """
+    Bank of :py:`n_voices` Sawtooth NCOs sharing a single phase accumulator.
+
+    Behaves like :py:`n_voices` independent :py:`SawNCO` instances, except
+    the voices are updated one after the other (1 voice every 2 clocks),
+    with the phase state of every voice kept in a small memory.
+
+    Members
+    -------
+    i : :py:`In(stream.Signature(data.StructLayout)`
+        Input stream, with fields :py:`freq_inc` (linear frequency of each
+        voice) and :py:`phase` (phase offset, common to all voices). One
+        output sample is produced for each input sample.
+    o : :py:`Out(stream.Signature(data.ArrayLayout(ASQ, n_voices)))`
+        Output stream, one sawtooth per voice.
+    """
+
+    def __init__(self, n_voices=8, extra_bits=16, shift=6):
+        self.n_voices = n_voices
+        self.extra_bits = extra_bits
+        self.shift = shift
+        self.stype = fixed.SQ(self.extra_bits, ASQ.f_width)
+        # phase accumulator state of each voice
+        self.mem = Memory(
+            shape=signed(self.stype.as_shape().width),
+            depth=n_voices, init=[])
+        super().__init__({
+            "i": In(stream.Signature(data.StructLayout({
+                "freq_inc": data.ArrayLayout(ASQ, n_voices),
+                "phase": ASQ,
+            }))),
+            "o": Out(stream.Signature(data.ArrayLayout(ASQ, n_voices))),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.mem = self.mem
+        wport = self.mem.write_port()
+        rport = self.mem.read_port()
+
+        i_latch = Signal.like(self.i.payload)
+        o_latch = Signal(data.ArrayLayout(ASQ, self.n_voices))
+        voice = Signal(range(self.n_voices))
+
+        s = fixed.Value(self.stype, rport.data)
+        s_next = Signal(self.stype)
+
+        m.d.comb += [
+            rport.addr.eq(voice),
+            wport.addr.eq(voice),
+            wport.data.eq(s_next.as_value()),
+            s_next.eq(s + i_latch.freq_inc[voice]),
+            self.o.payload.eq(o_latch),
+        ]
+
+        with m.FSM() as fsm:
+            with m.State('WAIT-VALID'):
+                m.d.comb += self.i.ready.eq(1),
+                with m.If(self.i.valid):
+                    m.d.sync += [
+                        i_latch.eq(self.i.payload),
+                        voice.eq(0),
+                    ]
+                    m.next = 'READ'
+            with m.State('READ'):
+                m.next = 'UPDATE'
+            with m.State('UPDATE'):
+                m.d.comb += wport.en.eq(1)
+                m.d.sync += o_latch[voice].eq((s >> self.shift) + i_latch.phase)
+                with m.If(voice == (self.n_voices - 1)):
+                    m.next = 'WAIT-READY'
+                with m.Else():
+                    m.d.sync += voice.eq(voice + 1)
+                    m.next = 'READ'
+            with m.State('WAIT-READY'):
+                m.d.comb += self.o.valid.eq(1),
+                with m.If(self.o.ready):
+                    m.next = 'WAIT-VALID'
+
+        return m
+
 class Trigger(wiring.Component):
 
     """
@@ -413,20 +522,49 @@ class WaveShaper(wiring.Component):
     stateless so we can precompute a mapping lookup table.
 
     Linear interpolation is used between lut elements.
-    """
 
-    i: In(stream.Signature(ASQ))
-    o: Out(stream.Signature(ASQ))
+    Instead of :py:`lut_function`, an existing LUT memory (see
+    :py:`WaveShaper.lut_memory`) may be passed as :py:`lut_mem`. Several
+    waveshapers can then share the same LUT, each with their own read port.
+    The caller is responsible for adding :py:`lut_mem` as a submodule.
 
-    def __init__(self, lut_function=None, lut_size=512, continuous=False, macp=None):
-        self.lut_size = lut_size
-        self.lut_addr_width = exact_log2(lut_size)
+    For :py:`n_channels > 1`, input and output payloads become a
+    :py:`data.ArrayLayout` of :py:`n_channels`. Each channel is looked up one
+    after the other, sharing a single LUT read port and multiplier.
+    """
+
+    def __init__(self, lut_function=None, lut_size=512, continuous=False, macp=None,
+                 lut_mem=None, n_channels=1):
         self.continuous = continuous
         self.macp = macp or mac.MAC.default()
+        self.n_channels = n_channels
 
-        # build LUT such that we can index into it using 2s
-        # complement and pluck out results with correct sign.
-        self.lut = []
+        if lut_mem is not None:
+            self.lut_size = lut_mem.depth
+            self.mem = None
+            # must be created before `lut_mem` is elaborated.
+            self.rport = lut_mem.read_port()
+        else:
+            self.lut_size = lut_size
+            self.mem = self.lut_memory(lut_function, lut_size)
+            self.rport = None
+
+        self.lut_addr_width = exact_log2(self.lut_size)
+
+        ctype = ASQ if n_channels == 1 else data.ArrayLayout(ASQ, n_channels)
+        super().__init__({
+            "i": In(stream.Signature(ctype)),
+            "o": Out(stream.Signature(ctype)),
+        })
+
+    @staticmethod
+    def lut_memory(lut_function, lut_size=512):
+        """
+        LUT memory for :py:`lut_function`, laid out such that we can
+        index into it using 2s complement and pluck out results with
+        correct sign.
+        """
+        lut = []
         for i in range(lut_size):
             x = None
             if i < lut_size//2:
@@ -434,24 +572,37 @@ class WaveShaper(wiring.Component):
             else:
                 x = 2*(i - lut_size) / lut_size
             fx = lut_function(x)
-            self.lut.append(fixed.Const(fx, shape=ASQ)._value)
-
-        super().__init__()
+            lut.append(fixed.Const(fx, shape=ASQ)._value)
+        # TODO (amaranth 0.5+): use native ASQ shape in LUT memory
+        return Memory(shape=signed(ASQ.as_shape().width), depth=lut_size, init=lut)
 
     def elaborate(self, platform):
         m = Module()
 
         m.submodules.macp = mp = self.macp
 
-        # TODO (amaranth 0.5+): use native ASQ shape in LUT memory
-        m.submodules.mem = mem = Memory(
-            shape=signed(ASQ.as_shape().width), depth=self.lut_size, init=self.lut)
-        rport = mem.read_port()
+        if self.mem is not None:
+            m.submodules.mem = self.mem
+            rport = self.mem.read_port()
+        else:
+            rport = self.rport
 
         ltype = fixed.SQ(self.lut_addr_width-1, ASQ.f_width-self.lut_addr_width+1)
 
-        x = Signal(ltype)
-        y = Signal(ASQ)
+        n_ch = self.n_channels
+
+        x_s = Signal(data.ArrayLayout(ltype, n_ch))
+        y_s = Signal(data.ArrayLayout(ASQ, n_ch))
+
+        # channel currently being looked up
+        ch = Signal(range(n_ch))
+        x = x_s[ch]
+        y = y_s[ch]
+
+        if n_ch == 1:
+            i_x, o_y = [self.i.payload], [self.o.payload]
+        else:
+            i_x, o_y = self.i.payload, self.o.payload
 
         trunc = Signal()
 
@@ -460,8 +611,9 @@ class WaveShaper(wiring.Component):
             with m.State('WAIT-VALID'):
                 m.d.comb += self.i.ready.eq(1),
                 with m.If(self.i.valid):
-                    m.d.sync += x.eq(self.i.payload << ltype.i_width)
-                    m.d.sync += y.eq(0)
+                    m.d.sync += [x_s[n].eq(i_x[n] << ltype.i_width) for n in range(n_ch)]
+                    m.d.sync += [y_s[n].eq(0) for n in range(n_ch)]
+                    m.d.sync += ch.eq(0)
                     m.next = 'READ0'
 
             with m.State('READ0'):
@@ -492,16 +644,126 @@ class WaveShaper(wiring.Component):
             with m.State('MAC1'):
                 with mp.Multiply(m, a=fixed.Value(ASQ, rport.data), b=(x.truncate()-x+1)):
                     m.d.sync += y.eq(y + mp.z)
+                    with m.If(ch == n_ch - 1):
+                        m.next = 'WAIT-READY'
+                    with m.Else():
+                        m.d.sync += ch.eq(ch + 1)
+                        m.next = 'READ0'
+
+            with m.State('WAIT-READY'):
+                m.d.comb += self.o.valid.eq(1)
+                m.d.comb += [o_y[n].eq(y_s[n]) for n in range(n_ch)]
+                with m.If(self.o.ready):
+                    m.next = 'WAIT-VALID'
+
+
+        return m
+
+class PolyWaveShaper(wiring.Component):
+
+    """
+    Waveshaper that maps x to an odd polynomial
+    :py:`f(x) = c[0]*x + c[1]*x**3 + c[2]*x**5 + ...` of the given
+    :py:`coefficients`, with output clipped to fit in a normal ASQ.
+
+    Unlike :py:`WaveShaper`, no LUT memory is needed. The polynomial is
+    evaluated using Horner's method in :py:`x**2`, which takes one multiply
+    per coefficient (plus one) one after the other on `macp`.
+
+    Intermediate results are scaled down by a power of 2 (computed from the
+    coefficients) so they fit the MAC's native type, at the cost of some
+    precision for large coefficients.
+
+    Coefficients for a given function may be found using :py:`odd_fit`.
+    """
+
+    i: In(stream.Signature(ASQ))
+    o: Out(stream.Signature(ASQ))
+
+    def __init__(self, coefficients, macp=None):
+        self.coefficients = coefficients
+        self.macp = macp or mac.MAC.default()
+
+        # Largest magnitude of any Horner partial result over |x| <= 1.
+        u = np.linspace(0, 1, 1025)
+        acc = np.full_like(u, coefficients[-1])
+        peak = abs(coefficients[-1])
+        for c in reversed(coefficients[:-1]):
+            peak = max(peak, np.abs(u*acc).max())
+            acc = c + u*acc
+            peak = max(peak, np.abs(acc).max())
+        self.shift = max(0, math.floor(math.log2(peak * 1.05)))
+
+        super().__init__()
+
+    @staticmethod
+    def odd_fit(function, degree):
+        """
+        Odd polynomial coefficients (least-squares on Chebyshev nodes, close
+        to minimax) approximating :py:`function` on :py:`-1 <= x <= 1`.
+        """
+        assert degree % 2 == 1
+        x = np.cos(np.pi*(np.arange(256) + 0.5)/256)
+        a = np.stack([x**k for k in range(1, degree+1, 2)], axis=1)
+        c, *_ = np.linalg.lstsq(a, np.vectorize(function)(x), rcond=None)
+        return list(c)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.macp = mp = self.macp
+
+        mtype = mac.SQNative
+
+        cs = [fixed.Const(c / 2**self.shift, shape=mtype)
+              for c in self.coefficients]
+
+        x   = Signal(mtype)
+        u   = Signal(mtype)
+        acc = Signal(mtype)
+        result = Signal(fixed.SQ(2+self.shift, ASQ.f_width))
+
+        with m.FSM() as fsm:
+
+            with m.State('WAIT-VALID'):
+                m.d.comb += self.i.ready.eq(1),
+                with m.If(self.i.valid):
+                    m.d.sync += x.eq(self.i.payload)
+                    m.d.sync += acc.eq(cs[-1])
+                    m.next = 'SQUARE'
+
+            with m.State('SQUARE'):
+                with mp.Multiply(m, a=x, b=x):
+                    m.d.sync += u.eq(mp.z)
+                    m.next = f'HORNER{len(cs)-2}' if len(cs) > 1 else 'ODD'
+
+            # acc = acc*u + c[k], for k = n-2 .. 0
+            for k in reversed(range(len(cs)-1)):
+                with m.State(f'HORNER{k}'):
+                    with mp.Multiply(m, a=acc, b=u):
+                        m.d.sync += acc.eq(mp.z + cs[k])
+                        m.next = f'HORNER{k-1}' if k > 0 else 'ODD'
+
+            with m.State('ODD'):
+                with mp.Multiply(m, a=acc, b=x):
+                    m.d.sync += result.eq(mp.z << self.shift)
                     m.next = 'WAIT-READY'
 
             with m.State('WAIT-READY'):
-                m.d.comb += [
-                    self.o.valid.eq(1),
-                    self.o.payload.eq(y),
-                ]
+                m.d.comb += self.o.valid.eq(1),
                 with m.If(self.o.ready):
                     m.next = 'WAIT-VALID'
 
+        sat_hi = fixed.Const(0, shape=ASQ)
+        sat_hi._value = 2**ASQ.f_width - 1 # move to Const.max()?
+        sat_lo = fixed.Const(-1, shape=ASQ)
+
+        with m.If(sat_hi < result):
+            m.d.comb += self.o.payload.eq(sat_hi),
+        with m.Elif(result < sat_lo):
+            m.d.comb += self.o.payload.eq(sat_lo),
+        with m.Else():
+            m.d.comb += self.o.payload.eq(result),
 
         return m
 
@@ -514,22 +776,29 @@ class SVF(wiring.Component):
 
     Highpass, lowpass, bandpass routed out on stream payloads `hp`, `lp`, `bp`.
 
+    For :py:`n_channels > 1`, every input and output field becomes a
+    :py:`data.ArrayLayout` of :py:`n_channels`. This is :py:`n_channels`
+    independent filters (each with their own `cutoff`, `resonance` and filter
+    state), which share a single multiplier and are computed one after the other.
+
     Reference: Fig.3 in https://arxiv.org/pdf/2111.05592
     """
 
-    def __init__(self, dtype=ASQ, macp=None):
+    def __init__(self, dtype=ASQ, macp=None, n_channels=1):
         self.dtype = dtype
         self.macp = macp or mac.MAC.default()
+        self.n_channels = n_channels
+        ctype = dtype if n_channels == 1 else data.ArrayLayout(dtype, n_channels)
         super().__init__({
             "i": In(stream.Signature(data.StructLayout({
-                    "x": dtype,
-                    "cutoff": dtype,
-                    "resonance": dtype,
+                    "x": ctype,
+                    "cutoff": ctype,
+                    "resonance": ctype,
                 }))),
             "o": Out(stream.Signature(data.StructLayout({
-                    "hp": dtype,
-                    "lp": dtype,
-                    "bp": dtype,
+                    "hp": ctype,
+                    "lp": ctype,
+                    "bp": ctype,
                 }))),
         })
 
@@ -540,13 +809,33 @@ class SVF(wiring.Component):
         m.submodules.macp = mp = self.macp
 
         mtype = mac.SQNative
-
-        abp   = Signal(mtype)
-        alp   = Signal(mtype)
-        ahp   = Signal(mtype)
-        x     = Signal(mtype)
-        kK    = Signal(mtype)
-        kQinv = Signal(mtype)
+        n_ch  = self.n_channels
+
+        # filter state of each channel
+        abp_s = Signal(data.ArrayLayout(mtype, n_ch))
+        alp_s = Signal(data.ArrayLayout(mtype, n_ch))
+        ahp_s = Signal(data.ArrayLayout(mtype, n_ch))
+        x_s   = Signal(data.ArrayLayout(mtype, n_ch))
+        kK_s    = Signal(data.ArrayLayout(mtype, n_ch))
+        kQinv_s = Signal(data.ArrayLayout(mtype, n_ch))
+
+        # channel currently being filtered
+        ch = Signal(range(n_ch))
+        abp = abp_s[ch]
+        alp = alp_s[ch]
+        ahp = ahp_s[ch]
+        x   = x_s[ch]
+        kK    = kK_s[ch]
+        kQinv = kQinv_s[ch]
+
+        if n_ch == 1:
+            i_x = [self.i.payload.x]
+            i_cutoff, i_resonance = [self.i.payload.cutoff], [self.i.payload.resonance]
+            o_hp, o_lp, o_bp = [self.o.payload.hp], [self.o.payload.lp], [self.o.payload.bp]
+        else:
+            i_x = self.i.payload.x
+            i_cutoff, i_resonance = self.i.payload.cutoff, self.i.payload.resonance
+            o_hp, o_lp, o_bp = self.o.payload.hp, self.o.payload.lp, self.o.payload.bp
 
         # internal oversampling iterations
         n_oversample = 2
@@ -557,13 +846,15 @@ class SVF(wiring.Component):
             with m.State('WAIT-VALID'):
                 m.d.comb += self.i.ready.eq(1),
                 with m.If(self.i.valid):
-                   m.d.sync += x.eq(self.i.payload.x),
+                   m.d.sync += [x_s[n].eq(i_x[n]) for n in range(n_ch)]
                    m.d.sync += oversample.eq(0)
-                   # FIXME: signedness (>=0)  check without working around `fixed`
-                   with m.If(self.i.payload.cutoff.as_value()[15] == 0):
-                       m.d.sync += kK.eq(self.i.payload.cutoff)
-                   with m.If(self.i.payload.resonance.as_value()[15] == 0):
-                       m.d.sync += kQinv.eq(self.i.payload.resonance)
+                   m.d.sync += ch.eq(0)
+                   for n in range(n_ch):
+                       # FIXME: signedness (>=0)  check without working around `fixed`
+                       with m.If(i_cutoff[n].as_value()[15] == 0):
+                           m.d.sync += kK_s[n].eq(i_cutoff[n])
+                       with m.If(i_resonance[n].as_value()[15] == 0):
+                           m.d.sync += kQinv_s[n].eq(i_resonance[n])
                    m.next = 'MAC0'
 
             with m.State('MAC0'):
@@ -586,18 +877,190 @@ class SVF(wiring.Component):
 
             with m.State('OVER'):
                 with m.If(oversample == n_oversample - 1):
-                    m.next = 'WAIT-READY'
+                    with m.If(ch == n_ch - 1):
+                        m.next = 'WAIT-READY'
+                    with m.Else():
+                        m.d.sync += oversample.eq(0)
+                        m.d.sync += ch.eq(ch + 1)
+                        m.next = 'MAC0'
                 with m.Else():
                     m.d.sync += oversample.eq(oversample + 1)
                     m.next = 'MAC0'
 
             with m.State('WAIT-READY'):
-                m.d.comb += [
-                    self.o.valid.eq(1),
-                    self.o.payload.hp.eq(ahp >> 1),
-                    self.o.payload.lp.eq(alp >> 1),
-                    self.o.payload.bp.eq(abp >> 1),
-                ]
+                m.d.comb += self.o.valid.eq(1)
+                for n in range(n_ch):
+                    m.d.comb += [
+                        o_hp[n].eq(ahp_s[n] >> 1),
+                        o_lp[n].eq(alp_s[n] >> 1),
+                        o_bp[n].eq(abp_s[n] >> 1),
+                    ]
+                with m.If(self.o.ready):
+                    m.next = 'WAIT-VALID'
+
+        return m
+
+class TrapezoidalSVF(wiring.Component):
+
+    """
+    Trapezoidal-integrator (Cytomic / 'zero-delay feedback') State Variable Filter.
+
+    Drop-in alternative to :py:`SVF` with the same stream interface. Unlike the
+    Chamberlin topology, this filter stays stable up to high cutoffs without
+    oversampling, and `cutoff` and `resonance` do not interact.
+
+    - `cutoff` is the prewarped integrator gain :py:`g = tan(pi*fc/fs)`, which
+      is ~ :py:`pi*fc/fs` for low cutoffs (similar to :py:`SVF`). The highest
+      cutoff (1.0) is :py:`fc = fs/4`.
+    - `resonance` is the damping :py:`k = 1/Q`, as for :py:`SVF`.
+
+    Per sample, only :py:`a1 = 1/(1+g*(g+k))` is taken from a small reciprocal
+    LUT. Everything else is 6 multiplies, computed one after the other on `macp`.
+
+    For :py:`n_channels > 1`, every input and output field becomes a
+    :py:`data.ArrayLayout` of :py:`n_channels`, as for :py:`SVF`.
+
+    Reference: https://cytomic.com/files/dsp/SvfLinearTrapOptimised2.pdf
+    """
+
+    def __init__(self, dtype=ASQ, macp=None, n_channels=1, lut_size=1024):
+        self.dtype = dtype
+        self.macp = macp or mac.MAC.default()
+        self.n_channels = n_channels
+        self.lut_size = lut_size
+        ctype = dtype if n_channels == 1 else data.ArrayLayout(dtype, n_channels)
+        super().__init__({
+            "i": In(stream.Signature(data.StructLayout({
+                    "x": ctype,
+                    "cutoff": ctype,
+                    "resonance": ctype,
+                }))),
+            "o": Out(stream.Signature(data.StructLayout({
+                    "hp": ctype,
+                    "lp": ctype,
+                    "bp": ctype,
+                }))),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.macp = mp = self.macp
+
+        mtype = mac.SQNative
+        n_ch  = self.n_channels
+
+        # a1 = 1/(1+gk) for gk = g*(g+k) in [0, 2), sampled at bin centers.
+        lut_bits = exact_log2(self.lut_size)
+        lut = [fixed.Const(1/(1 + 2*(n + 0.5)/self.lut_size), shape=mtype)._value
+               for n in range(self.lut_size)]
+        m.submodules.a1_mem = a1_mem = Memory(
+            shape=signed(mtype.as_shape().width), depth=self.lut_size, init=lut)
+        rport = a1_mem.read_port()
+
+        # filter state and outputs of each channel
+        ic1_s = Signal(data.ArrayLayout(mtype, n_ch))
+        ic2_s = Signal(data.ArrayLayout(mtype, n_ch))
+        hp_s  = Signal(data.ArrayLayout(mtype, n_ch))
+        lp_s  = Signal(data.ArrayLayout(mtype, n_ch))
+        bp_s  = Signal(data.ArrayLayout(mtype, n_ch))
+        x_s   = Signal(data.ArrayLayout(mtype, n_ch))
+        g_s   = Signal(data.ArrayLayout(mtype, n_ch))
+        k_s   = Signal(data.ArrayLayout(mtype, n_ch))
+
+        # channel currently being filtered
+        ch = Signal(range(n_ch))
+        ic1 = ic1_s[ch]
+        ic2 = ic2_s[ch]
+        v1  = bp_s[ch]
+        v2  = lp_s[ch]
+        hp  = hp_s[ch]
+        x   = x_s[ch]
+        g   = g_s[ch]
+        k   = k_s[ch]
+
+        # intermediate results
+        gk = Signal(mtype)
+        t  = Signal(mtype)
+        a1 = Signal(mtype)
+
+        # gk is always positive, so its LUT index is just the top bits.
+        m.d.comb += [
+            rport.addr.eq(gk.as_value()[mtype.f_width+1-lut_bits:mtype.f_width+1]),
+            a1.raw().eq(rport.data),
+        ]
+
+        if n_ch == 1:
+            i_x = [self.i.payload.x]
+            i_cutoff, i_resonance = [self.i.payload.cutoff], [self.i.payload.resonance]
+            o_hp, o_lp, o_bp = [self.o.payload.hp], [self.o.payload.lp], [self.o.payload.bp]
+        else:
+            i_x = self.i.payload.x
+            i_cutoff, i_resonance = self.i.payload.cutoff, self.i.payload.resonance
+            o_hp, o_lp, o_bp = self.o.payload.hp, self.o.payload.lp, self.o.payload.bp
+
+        with m.FSM() as fsm:
+
+            with m.State('WAIT-VALID'):
+                m.d.comb += self.i.ready.eq(1),
+                with m.If(self.i.valid):
+                   m.d.sync += [x_s[n].eq(i_x[n]) for n in range(n_ch)]
+                   m.d.sync += ch.eq(0)
+                   for n in range(n_ch):
+                       # FIXME: signedness (>=0)  check without working around `fixed`
+                       with m.If(i_cutoff[n].as_value()[15] == 0):
+                           m.d.sync += g_s[n].eq(i_cutoff[n])
+                       with m.If(i_resonance[n].as_value()[15] == 0):
+                           m.d.sync += k_s[n].eq(i_resonance[n])
+                   m.next = 'MAC0'
+
+            with m.State('MAC0'):
+                # gk = g*(g+k)
+                with mp.Multiply(m, a=g, b=g+k):
+                    m.d.sync += gk.eq(mp.z)
+                    m.next = 'MAC1'
+
+            with m.State('MAC1'):
+                # t = ic1 + g*(x - ic2)
+                with mp.Multiply(m, a=g, b=x-ic2):
+                    # a1 LUT read (addressed by gk) is ready from here.
+                    m.d.sync += t.eq(mp.z + ic1)
+                    m.next = 'MAC2'
+
+            with m.State('MAC2'):
+                # v1 = a1*t = a1*ic1 + a2*(x - ic2)
+                with mp.Multiply(m, a=a1, b=t):
+                    m.d.sync += v1.eq(mp.z)
+                    m.next = 'MAC3'
+
+            with m.State('MAC3'):
+                # v2 = ic2 + g*v1 = ic2 + a2*ic1 + a3*(x - ic2)
+                with mp.Multiply(m, a=g, b=v1):
+                    m.d.sync += v2.eq(mp.z + ic2)
+                    m.next = 'MAC4'
+
+            with m.State('MAC4'):
+                # hp = x - k*v1 - v2, and update integrator state.
+                with mp.Multiply(m, a=k, b=v1):
+                    m.d.sync += [
+                        hp.eq(x - mp.z - v2),
+                        ic1.eq((v1 << 1) - ic1),
+                        ic2.eq((v2 << 1) - ic2),
+                    ]
+                    with m.If(ch == n_ch - 1):
+                        m.next = 'WAIT-READY'
+                    with m.Else():
+                        m.d.sync += ch.eq(ch + 1)
+                        m.next = 'MAC0'
+
+            with m.State('WAIT-READY'):
+                m.d.comb += self.o.valid.eq(1)
+                for n in range(n_ch):
+                    m.d.comb += [
+                        o_hp[n].eq(hp_s[n] >> 1),
+                        o_lp[n].eq(lp_s[n] >> 1),
+                        o_bp[n].eq(bp_s[n] >> 1),
+                    ]
                 with m.If(self.o.ready):
                     m.next = 'WAIT-VALID'
 
@@ -752,15 +1215,19 @@ class MatrixMix(wiring.Component):
     Coefficients must fit inside the self.ctype declared below.
     Coefficients can be updated in real-time by writing them
     to the `c` stream (position `o_x`, `i_y`, value `v`).
+
+    The multiplier is provided by :py:`macp`, so it may be shared
+    with other cores (e.g. a :py:`mac.RingMACServer` client).
     """
 
-    def __init__(self, i_channels, o_channels, coefficients):
+    def __init__(self, i_channels, o_channels, coefficients, macp=None):
 
         assert(len(coefficients)       == i_channels)
         assert(len(coefficients[0])    == o_channels)
 
         self.i_channels = i_channels
         self.o_channels = o_channels
+        self.macp = macp or mac.MAC.default()
 
         self.ctype = fixed.SQ(2, ASQ.f_width)
 
@@ -791,6 +1258,7 @@ class MatrixMix(wiring.Component):
     def elaborate(self, platform):
         m = Module()
 
+        m.submodules.macp = mp = self.macp
         m.submodules.mem = self.mem
         wport = self.mem.write_port()
         rport = self.mem.read_port(transparent_for=(wport,))
@@ -858,14 +1326,14 @@ class MatrixMix(wiring.Component):
                 with m.Else():
                     m.d.sync += o_ch.eq(o_ch+1)
             with m.State('MAC'):
-                m.next = 'NEXT'
-                m.d.sync += [
-                    o_accum[o_ch_l].eq(o_accum[o_ch_l] +
-                                       (fixed.Value(self.ctype, rport.data) *
-                                        i_latch[l_i_ch]))
-                ]
-                with m.If(done):
-                    m.next = 'WAIT-READY'
+                # hold the coefficient while the multiplier is busy
+                m.d.comb += rport.en.eq(0)
+                with mp.Multiply(m, a=fixed.Value(self.ctype, rport.data),
+                                    b=i_latch[l_i_ch]):
+                    m.d.sync += o_accum[o_ch_l].eq(o_accum[o_ch_l] + mp.z)
+                    m.next = 'NEXT'
+                    with m.If(done):
+                        m.next = 'WAIT-READY'
             with m.State('WAIT-READY'):
                 m.d.comb += self.c.ready.eq(1), # permit coefficient updates
                 m.d.comb += [
@@ -880,6 +1348,89 @@ class MatrixMix(wiring.Component):
 
         return m
 
+class MatrixMixConst(wiring.Component):
+
+    """
+    Matrix mixer with constant coefficients, fixed at elaboration time.
+
+    Each coefficient is decomposed into a sum of signed powers of two
+    (canonical signed digit form), so the mix is built from shifts and
+    adders only, without any multipliers. This is cheapest for coefficients
+    with few non-zero digits, for example :py:`0.1875 = 2**-2 - 2**-4`.
+
+    Same :py:`i` and :py:`o` streams as :py:`MatrixMix` (there is no
+    coefficient update stream). The output is combinatorial.
+    """
+
+    def __init__(self, i_channels, o_channels, coefficients):
+
+        assert(len(coefficients)       == i_channels)
+        assert(len(coefficients[0])    == o_channels)
+
+        self.i_channels = i_channels
+        self.o_channels = o_channels
+        self.coefficients = coefficients
+
+        super().__init__({
+            "i": In(stream.Signature(data.ArrayLayout(ASQ, i_channels))),
+            "o": Out(stream.Signature(data.ArrayLayout(ASQ, o_channels))),
+        })
+
+    @staticmethod
+    def csd(k):
+        """
+        Canonical signed digit form of integer :py:`k`, as a list of
+        :py:`(sign, power)` such that :py:`k == sum(sign*2**power)`.
+        """
+        digits = []
+        p = 0
+        while k != 0:
+            if k & 1:
+                d = 2 - (k & 3)
+                digits.append((d, p))
+                k -= d
+            k >>= 1
+            p += 1
+        return digits
+
+    def elaborate(self, platform):
+        m = Module()
+
+        def shifted(x, p):
+            # x * 2**p, without losing any precision.
+            return x << p if p >= 0 else x >> -p
+
+        def tree_sum(terms):
+            while len(terms) > 1:
+                terms = [terms[n] + terms[n+1] if n+1 < len(terms) else terms[n]
+                         for n in range(0, len(terms), 2)]
+            return terms[0]
+
+        for o_ch in range(self.o_channels):
+            pos = []
+            neg = []
+            for i_ch in range(self.i_channels):
+                k = fixed.Const(self.coefficients[i_ch][o_ch], shape=mac.SQNative)._value
+                for sign, p in self.csd(k):
+                    term = shifted(self.i.payload[i_ch], p - ASQ.f_width)
+                    (pos if sign > 0 else neg).append(term)
+            if pos and neg:
+                total = tree_sum(pos) - tree_sum(neg)
+            elif pos:
+                total = tree_sum(pos)
+            elif neg:
+                total = -tree_sum(neg)
+            else:
+                total = fixed.Const(0, shape=ASQ)
+            m.d.comb += self.o.payload[o_ch].eq(total)
+
+        m.d.comb += [
+            self.o.valid.eq(self.i.valid),
+            self.i.ready.eq(self.o.ready),
+        ]
+
+        return m
+
 class FIR(wiring.Component):
 
     """
@@ -888,20 +1439,31 @@ class FIR(wiring.Component):
     This filter contains some optional optimizations to act as an efficient
     interpolator/decimator. For details, see :py:`stride_i`, :py:`stride_o` below.
 
+    Taps which are zero by design are skipped entirely (no MAC is performed
+    for them). This is what makes half-band filters (where every second tap is
+    zero) cheap, especially as interpolators with :py:`stride_i == 2`, where
+    one of the 2 phases only contains the center tap.
+
+    For :py:`n_channels > 1`, the same taps are applied to every channel. Tap
+    storage and the multiplier are shared between channels, the MAC simply
+    iterates over all channels for each tap before moving to the next one.
+
     Members
     -------
     i : :py:`In(stream.Signature(ASQ))`
-        Input stream for sending samples to the filter.
+        Input stream for sending samples to the filter. For :py:`n_channels > 1`,
+        this is :py:`In(stream.Signature(data.ArrayLayout(ASQ, n_channels)))`.
     o : :py:`In(stream.Signature(ASQ))`
         Output stream for getting samples from the filter. There is 1 output
-        sample per input sample, presented :py:`filter_order+1` cycles after
-        the input sample. For :py:`stride_o > 1`, there is only 1 output
-        sample per :py:`stride_o` input samples.
+        sample per input sample, presented :py:`n_channels*n_taps+1` cycles
+        after the input sample, where :py:`n_taps` is the number of non-zero
+        taps in the current :py:`stride_i` phase (at least 1). Without zero
+        taps and with :py:`stride_i == 1`, this is :py:`n_channels*filter_order+1`.
+        For :py:`stride_o > 1`, there is only 1 output
+        sample per :py:`stride_o` input samples. For :py:`n_channels > 1`,
+        this is :py:`Out(stream.Signature(data.ArrayLayout(ASQ, n_channels)))`.
     """
 
-    i: In(stream.Signature(ASQ))
-    o: Out(stream.Signature(ASQ))
-
     def __init__(self,
                  fs:               int,
                  filter_cutoff_hz: int,
@@ -909,7 +1471,8 @@ class FIR(wiring.Component):
                  filter_type:      str='lowpass',
                  prescale:         float=1,
                  stride_i:         int=1,
-                 stride_o:         int=1):
+                 stride_o:         int=1,
+                 n_channels:       int=1):
         """
         fs : int
             Sample rate of the filter, used for calculating FIR coefficients.
@@ -927,8 +1490,9 @@ class FIR(wiring.Component):
         stride_i : int
             When an FIR filter is used as an interpolator, a common pattern is
             to provide 1 'actual' sample and pad S-1 zeroes for every S
-            output samples needed. For any :py:`stride > 1`, the :py:`stride`
-            must evenly divide :py:`filter_order` (i.e. no remainder). For
+            output samples needed. For any :py:`stride > 1`, if the :py:`stride`
+            does not evenly divide :py:`filter_order`, taps are padded with
+            zeroes until it does (these cost no MACs). For
             :py:`stride > 1`, this core applies some optimizations, assuming
             every S'th sample is nonzero, and the rest are zero. This results in
             a factor S reduction in MAC ops (latency) and a factor S reduction in
@@ -941,15 +1505,29 @@ class FIR(wiring.Component):
             :py:`stride_o == M`, only 1 output sample is produced per M input
             samples. This does not reduce LUT/RAM usage, but avoids performing
             MACs to produce samples that will be discarded.
+        n_channels : int
+            Number of channels filtered by this core. For :py:`n_channels > 1`,
+            samples are stored per-channel, but taps and the multiplier are shared.
         """
         taps = signal.firwin(numtaps=filter_order, cutoff=filter_cutoff_hz,
                              fs=fs, pass_zero=filter_type, window='hamming')
-        assert len(taps) % stride_i == 0
+        taps = np.pad(taps, (0, -len(taps) % stride_i))
         self.taps_float = taps
         self.prescale   = prescale
         self.stride_i   = stride_i
         self.stride_o   = stride_o
-        super().__init__()
+        self.n_channels = n_channels
+
+        if n_channels == 1:
+            super().__init__({
+                "i": In(stream.Signature(ASQ)),
+                "o": Out(stream.Signature(ASQ)),
+            })
+        else:
+            super().__init__({
+                "i": In(stream.Signature(data.ArrayLayout(ASQ, n_channels))),
+                "o": Out(stream.Signature(data.ArrayLayout(ASQ, n_channels))),
+            })
 
     def elaborate(self, platform):
         m = Module()
@@ -960,22 +1538,59 @@ class FIR(wiring.Component):
 
         n = len(self.taps_float)
 
-        # Filter tap memory and read port
-
         # If t*prescale overflows, fixed.Const should provide a warning.
+        taps = [fixed.Const(t*self.prescale, shape=self.ctype) for t in self.taps_float]
+
+        # Number of samples stored per channel.
+        depth = n//self.stride_i
+
+        # MAC schedule. For every stride_i phase, a list of sample offsets 'k'
+        # (age of the sample in the input memory) with nonzero taps. Each entry
+        # uses tap 'phase + k*stride_i'. Every phase needs at least 1 entry, even
+        # if all its taps are zero, so that an output sample is always produced.
+        # Taps are compared before quantization, small (but nonzero) taps
+        # are kept so the filter latency only depends on its design.
+        schedule = []
+        phase_start = []
+        for phase in range(self.stride_i):
+            ks = [k for k in range(depth)
+                  if not math.isclose(self.taps_float[phase + k*self.stride_i], 0, abs_tol=1e-12)]
+            ks = ks or [0]
+            phase_start.append(len(schedule))
+            schedule.extend([(phase + k*self.stride_i, k, k == ks[-1]) for k in ks])
+
+        # Filter tap memory and read port, taps are stored in schedule order.
+
         m.submodules.taps_mem = taps_mem = Memory(
-            shape=self.ctype, depth=n, init=[
-                fixed.Const(t*self.prescale, shape=self.ctype)
-                for t in self.taps_float
+            shape=self.ctype, depth=len(schedule), init=[
+                taps[ix] for ix, _, _ in schedule
             ]
         )
 
         taps_rport = taps_mem.read_port()
 
-        # Input sample memory, write and read port
+        # Schedule memory, read combinatorially so sample read addresses
+        # can be computed in the same cycle as the tap read address.
+
+        sched_layout = data.StructLayout({
+            "k":    range(depth),
+            "last": unsigned(1),
+        })
+        m.submodules.sched_mem = sched_mem = Memory(
+            shape=sched_layout, depth=len(schedule), init=[
+                {"k": k, "last": last} for _, k, last in schedule
+            ]
+        )
+
+        sched_rport = sched_mem.read_port(domain="comb")
+
+        # Input sample memory, write and read port. One word holds
+        # the samples of all channels at the same point in time.
+
+        n_ch = self.n_channels
 
         m.submodules.x_mem = x_mem = Memory(
-            shape=self.ctype, depth=n//self.stride_i, init=[]
+            shape=data.ArrayLayout(self.ctype, n_ch), depth=depth, init=[]
         )
 
         x_wport = x_mem.write_port()
@@ -983,11 +1598,8 @@ class FIR(wiring.Component):
 
         # FIR filter logic
 
-        # Number of MACs performed per sample, up to n/self.stride
-        macs   = Signal(range(n))
-
         # Write position in input sample memory
-        w_pos  = Signal(range(n), init=1)
+        w_pos  = Signal(range(depth), init=1)
 
         # Stride position from 0 .. self.stride_i, moves by 1 every
         # input sample to shift taps looked at (even if the input
@@ -999,27 +1611,50 @@ class FIR(wiring.Component):
         # calculated/emitted once per every M samples.
         stride_o_pos  = Signal(range(self.stride_o), init=0)
 
-        # Read indices into tap and sample memories
-        ix_tap = Signal(range(n))
-        ix_rd  = Signal(range(n))
+        # Read index into tap and schedule memories
+        ix_tap = Signal(range(len(schedule)+1))
+
+        # Position of the newest sample in the input sample memory. Samples
+        # are read at an offset 'k' behind this, as given by the schedule.
+        rd_base   = Signal(range(depth))
+        rd_base_l = Signal(range(depth))
+        k         = Signal(range(depth))
+
+        # Set if the tap currently being used by the MAC is the last
+        # one scheduled for this phase.
+        last = Signal()
+
+        # Channel currently being accumulated. Memory read ports are only
+        # advanced after the last channel has used the current tap.
+        ch = Signal(range(n_ch))
+        rd_en = Signal(init=1)
 
         # MAC variables: y = a * b
         a  = Signal(self.ctype)
         b  = Signal(self.ctype)
-        y  = Signal(self.ctype)
+        y  = [Signal(self.ctype, name=f"y{c}") for c in range(n_ch)]
 
-        m.d.comb += taps_rport.en.eq(1)
+        m.d.comb += taps_rport.en.eq(rd_en)
         m.d.comb += taps_rport.addr.eq(ix_tap)
-        m.d.comb += x_wport.data.eq(self.i.payload)
-        m.d.comb += x_rport.addr.eq(ix_rd)
-        m.d.comb += x_rport.en.eq(1)
+        m.d.comb += sched_rport.addr.eq(ix_tap)
+        m.d.comb += k.eq(sched_rport.data.k)
+        if n_ch == 1:
+            m.d.comb += x_wport.data[0].eq(self.i.payload)
+        else:
+            m.d.comb += [x_wport.data[c].eq(self.i.payload[c]) for c in range(n_ch)]
+        m.d.comb += rd_base.eq(rd_base_l)
+        with m.If(rd_base >= k):
+            m.d.comb += x_rport.addr.eq(rd_base - k)
+        with m.Else():
+            m.d.comb += x_rport.addr.eq(rd_base + depth - k)
+        m.d.comb += x_rport.en.eq(rd_en)
 
-        with m.If(w_pos == (n//self.stride_i - 1)):
+        with m.If(w_pos == (depth - 1)):
             m.d.comb += x_wport.addr.eq(0)
         with m.Else():
             m.d.comb += x_wport.addr.eq(w_pos+1)
 
-        valid = Signal()
+        phase_start = Array(Const(ix, range(len(schedule))) for ix in phase_start)
 
         with m.FSM() as fsm:
             with m.State('WAIT-VALID'):
@@ -1028,14 +1663,18 @@ class FIR(wiring.Component):
                     with m.If(stride_i_pos == 0):
                         m.d.comb += x_wport.en.eq(1)
                     # Set up first MAC combinatorially
-                    m.d.comb += x_rport.addr.eq(x_wport.addr)
-                    m.d.comb += taps_rport.addr.eq(stride_i_pos)
-                    # Subsequent MACs use ix_rd / ix_tap.
+                    m.d.comb += [
+                        rd_base.eq(x_wport.addr),
+                        taps_rport.addr.eq(phase_start[stride_i_pos]),
+                        sched_rport.addr.eq(phase_start[stride_i_pos]),
+                    ]
+                    # Subsequent MACs use ix_tap / rd_base_l.
                     m.d.sync += [
-                        ix_rd.eq(w_pos),
-                        ix_tap.eq(stride_i_pos + self.stride_i),
-                        y.eq(0),
-                        macs.eq(0),
+                        rd_base_l.eq(x_wport.addr),
+                        ix_tap.eq(phase_start[stride_i_pos] + 1),
+                        last.eq(sched_rport.data.last),
+                        [y[c].eq(0) for c in range(n_ch)],
+                        ch.eq(0),
                     ]
 
                     with m.If(stride_o_pos == 0):
@@ -1045,23 +1684,26 @@ class FIR(wiring.Component):
 
             with m.State("MAC"):
                 m.d.comb += [
-                    a.eq(x_rport.data),
                     b.eq(taps_rport.data),
+                    rd_en.eq(ch == (n_ch - 1)),
                 ]
-                m.d.sync += [
-                    y.eq(y + (a * b)),
-                    macs.eq(macs+1),
-                ]
-                # next tap read position
-                m.d.sync += ix_tap.eq(ix_tap + self.stride_i),
-                # next sample read position
-                with m.If(ix_rd == 0):
-                    m.d.sync += ix_rd.eq((n//self.stride_i - 1))
+                with m.Switch(ch):
+                    for c in range(n_ch):
+                        with m.Case(c):
+                            m.d.comb += a.eq(x_rport.data[c])
+                            m.d.sync += y[c].eq(y[c] + (a * b))
+                with m.If(ch == (n_ch - 1)):
+                    m.d.sync += [
+                        ch.eq(0),
+                        # next tap / sample read position
+                        ix_tap.eq(ix_tap + 1),
+                        last.eq(sched_rport.data.last),
+                    ]
+                    # done?
+                    with m.If(last):
+                        m.next = "WAIT-READY"
                 with m.Else():
-                    m.d.sync += ix_rd.eq(ix_rd - 1),
-                # done?
-                with m.If(macs == (n//self.stride_i - 1)):
-                    m.next = "WAIT-READY"
+                    m.d.sync += ch.eq(ch + 1)
 
             with m.State('WAIT-READY'):
 
@@ -1069,17 +1711,18 @@ class FIR(wiring.Component):
                 # assert 'valid', simply update the stride counters and jump
                 # straight back to 'WAIT-VALID'.
 
-                m.d.comb += [
-                    self.o.valid.eq(stride_o_pos == 0),
-                    self.o.payload.eq(y)
-                ]
+                m.d.comb += self.o.valid.eq(stride_o_pos == 0)
+                if n_ch == 1:
+                    m.d.comb += self.o.payload.eq(y[0])
+                else:
+                    m.d.comb += [self.o.payload[c].eq(y[c]) for c in range(n_ch)]
 
                 with m.If(self.o.ready | (stride_o_pos != 0)):
 
                     # update write and stride_i offsets.
                     with m.If(stride_i_pos == (self.stride_i - 1)):
                         m.d.sync += stride_i_pos.eq(0)
-                        with m.If(w_pos == (n//self.stride_i - 1)):
+                        with m.If(w_pos == (depth - 1)):
                             m.d.sync += w_pos.eq(0)
                         with m.Else():
                             m.d.sync += w_pos.eq(w_pos+1)
@@ -1110,24 +1753,28 @@ class Resample(wiring.Component):
     for large upsampling/interpolating ratios, and is what makes this a polyphase
     resampler - time complexity per output sample proportional to O(fir_order/N).
 
+    For :py:`n_channels > 1`, all channels are resampled by a single FIR core,
+    such that filter taps and the multiplier are shared between channels.
+
     Members
     -------
     i : :py:`In(stream.Signature(ASQ))`
         Input stream for sending samples to the resampler at sample rate :py:`fs_in`.
+        For :py:`n_channels > 1`, the payload is :py:`data.ArrayLayout(ASQ, n_channels)`.
     o : :py:`In(stream.Signature(ASQ))`
         Output stream for getting samples from the resampler. Samples are produced
         at a rate determined by :py:`fs_in * (n_up / m_down)`.
+        For :py:`n_channels > 1`, the payload is :py:`data.ArrayLayout(ASQ, n_channels)`.
     """
 
-    i: In(stream.Signature(ASQ))
-    o: Out(stream.Signature(ASQ))
-
     def __init__(self,
                  fs_in:      int,
                  n_up:       int,
                  m_down:     int,
                  bw:         float=0.4,
-                 order_mult: int=5):
+                 order_mult: int=5,
+                 n_channels: int=1,
+                 filter_order: int=None):
         """
         fs_in : int
             Expected sample rate of incoming samples, used for calculating filter coefficients.
@@ -1143,6 +1790,13 @@ class Resample(wiring.Component):
             Filter order multiplier, determines number of taps in underlying FIR filter. The
             underlying tap count is determined as :py:`order_factor*max(self.n_up, self.m_down)`,
             rounded up to the next multiple of :py:`n_up` (required for even zero padding).
+        n_channels : int
+            Number of channels resampled by this core, all at the same ratio.
+        filter_order : int, optional
+            Exact number of taps in the underlying FIR filter, overrides :py:`order_mult`.
+            Taps are zero-padded to the next multiple of :py:`n_up`. For example, with
+            :py:`n_up=2, m_down=1, bw=0.5` and an odd :py:`filter_order`, this is a
+            half-band interpolator, where every second tap is zero and skipped by the FIR.
         """
 
         gcd = math.gcd(n_up, m_down)
@@ -1155,13 +1809,15 @@ class Resample(wiring.Component):
         self.n_up   = n_up
         self.m_down = m_down
         self.bw     = bw
+        self.n_channels = n_channels
 
-        filter_order = order_mult*max(self.n_up, self.m_down)
-        if filter_order % self.n_up != 0:
-            # If the filter is not divisible by n_up, choose the next largest filter
-            # order that is, so that we can use FIR 'stride' (polyphase resampling
-            # optimization based on known zero padding).
-            filter_order = self.n_up * ((filter_order // self.n_up) + 1)
+        if filter_order is None:
+            filter_order = order_mult*max(self.n_up, self.m_down)
+            if filter_order % self.n_up != 0:
+                # If the filter is not divisible by n_up, choose the next largest filter
+                # order that is, so that we can use FIR 'stride' (polyphase resampling
+                # optimization based on known zero padding).
+                filter_order = self.n_up * ((filter_order // self.n_up) + 1)
 
         self.filt = FIR(
             fs=self.fs_in*self.n_up,
@@ -1170,10 +1826,20 @@ class Resample(wiring.Component):
             filter_order=filter_order,
             prescale=self.n_up,
             stride_i=self.n_up,
-            stride_o=self.m_down
+            stride_o=self.m_down,
+            n_channels=n_channels
         )
 
-        super().__init__()
+        if n_channels == 1:
+            super().__init__({
+                "i": In(stream.Signature(ASQ)),
+                "o": Out(stream.Signature(ASQ)),
+            })
+        else:
+            super().__init__({
+                "i": In(stream.Signature(data.ArrayLayout(ASQ, n_channels))),
+                "o": Out(stream.Signature(data.ArrayLayout(ASQ, n_channels))),
+            })
 
     def elaborate(self, platform):
 
@@ -1181,7 +1847,6 @@ class Resample(wiring.Component):
 
         m.submodules.filt = filt = self.filt
 
-        upsampled_signal  = Signal(ASQ)
         upsample_counter  = Signal(range(self.n_up))
 
         m.d.comb += [
@@ -1298,6 +1963,109 @@ class CountingFollower(wiring.Component):
                 m.d.sync += self.o.payload.eq(self.o.payload - 1)
         return m
 
+class CountingFollowerBank(wiring.Component):
+    """
+    Bank of :py:`n` counting followers (see :py:`CountingFollower`), sharing
+    a single comparator and up/down counter.
+
+    For each input sample, every follower gets 1 count closer to its input,
+    one follower per clock. :py:`o.payload` always reflects the current state
+    of all followers, :py:`o.valid` is asserted once all have been updated.
+    """
+
+    def __init__(self, n=8, bits=8):
+        self.n = n
+        self.bits = bits
+        super().__init__({
+            "i": In(stream.Signature(data.ArrayLayout(unsigned(bits), n))),
+            "o": Out(stream.Signature(data.ArrayLayout(unsigned(bits), n))),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        state  = Signal(data.ArrayLayout(unsigned(self.bits), self.n))
+        target = Signal(data.ArrayLayout(unsigned(self.bits), self.n))
+        ch     = Signal(range(self.n))
+
+        m.d.comb += self.o.payload.eq(state)
+
+        with m.FSM() as fsm:
+            with m.State('WAIT-VALID'):
+                m.d.comb += self.i.ready.eq(1),
+                with m.If(self.i.valid):
+                    m.d.sync += [
+                        target.eq(self.i.payload),
+                        ch.eq(0),
+                    ]
+                    m.next = 'UPDATE'
+            with m.State('UPDATE'):
+                with m.If(state[ch] < target[ch]):
+                    m.d.sync += state[ch].eq(state[ch] + 1)
+                with m.Elif(state[ch] > target[ch]):
+                    m.d.sync += state[ch].eq(state[ch] - 1)
+                with m.If(ch == (self.n - 1)):
+                    m.next = 'WAIT-READY'
+                with m.Else():
+                    m.d.sync += ch.eq(ch + 1)
+            with m.State('WAIT-READY'):
+                m.d.comb += self.o.valid.eq(1),
+                with m.If(self.o.ready):
+                    m.next = 'WAIT-VALID'
+
+        return m
+
+class SkidBuffer(wiring.Component):
+    """
+    Single-entry skid buffer.
+
+    Registers a stream so that :py:`w_stream.ready` does not depend
+    combinatorially on :py:`r_stream.ready`. An output register plus
+    one 'skid' register absorb the cycle of latency on back-pressure.
+
+    Ports are named like :py:`SyncFIFOBuffered`, so this can stand in
+    for a small FIFO wherever the consumer drains at the producer rate.
+    As with a FIFO, a producer that ignores :py:`w_stream.ready` drops
+    samples while both registers are occupied.
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        super().__init__({
+            "w_stream": In(stream.Signature(unsigned(width))),
+            "r_stream": Out(stream.Signature(unsigned(width))),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        skid       = Signal(self.width)
+        skid_valid = Signal()
+
+        m.d.comb += self.w_stream.ready.eq(~skid_valid)
+
+        with m.If(self.r_stream.ready | ~self.r_stream.valid):
+            # output register free (or being emptied this cycle)
+            with m.If(skid_valid):
+                m.d.sync += [
+                    self.r_stream.payload.eq(skid),
+                    self.r_stream.valid.eq(1),
+                    skid_valid.eq(0),
+                ]
+            with m.Else():
+                m.d.sync += [
+                    self.r_stream.payload.eq(self.w_stream.payload),
+                    self.r_stream.valid.eq(self.w_stream.valid),
+                ]
+        with m.Elif(self.w_stream.valid & self.w_stream.ready):
+            # output stalled, park the incoming word
+            m.d.sync += [
+                skid.eq(self.w_stream.payload),
+                skid_valid.eq(1),
+            ]
+
+        return m
+
 def named_submodules(m_submodules, elaboratables, override_name=None):
     """
     Normally, using constructs like:
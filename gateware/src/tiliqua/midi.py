@@ -18,6 +18,30 @@ from tiliqua.eurorack_pmod import ASQ # hardware native fixed-point sample type
 
 MIDI_BAUD_RATE = 31250
 
+def _note_freq_inc_lut(sample_rate_hz=48000):
+    """MIDI note -> linearized frequency (NCO increment), raw ASQ values."""
+    lut = []
+    for i in range(128):
+        freq = 440 * 2**((i-69)/12.0)
+        freq_inc = freq * (1.0 / sample_rate_hz)
+        lut.append(fixed.Const(freq_inc, shape=ASQ)._value)
+    return lut
+
+def _note_volts_lut():
+    """MIDI note -> V/Oct voltage (1V/oct, note 60 at 0V), raw ASQ values."""
+    lut = []
+    for i in range(128):
+        volts_per_note = 1.0/12.0
+        volts = i*volts_per_note - 5
+        # convert volts to audio sample
+        x = volts/(2**15/4000)
+        lut.append(fixed.Const(x, shape=ASQ)._value)
+    return lut
+
+# Same for every MidiVoiceTracker / MonoMidiCV, so only computed once (not on every elaboration).
+_NOTE_FREQ_INC_LUT = _note_freq_inc_lut()
+_NOTE_VOLTS_LUT = _note_volts_lut()
+
 class MessageType(enum.Enum, shape=unsigned(4)):
     NOTE_OFF         = 0x8
     NOTE_ON          = 0x9
@@ -212,12 +236,7 @@ class MidiVoiceTracker(wiring.Component):
 
         # MIDI note -> linearized frequency LUT memory (exponential converter)
 
-        lut = []
-        sample_rate_hz = 48000
-        for i in range(128):
-            freq = 440 * 2**((i-69)/12.0)
-            freq_inc = freq * (1.0 / sample_rate_hz)
-            lut.append(fixed.Const(freq_inc, shape=ASQ)._value)
+        lut = _NOTE_FREQ_INC_LUT
         m.submodules.f_lut_mem = f_lut_mem = Memory(
                 shape=signed(ASQ.as_shape().width), depth=len(lut), init=lut)
         f_lut_rport = f_lut_mem.read_port()
@@ -354,18 +373,22 @@ class MidiVoiceTracker(wiring.Component):
                     calculated_freq.eq(f_inc_base + f_inc_base*pb_scaled),
                 ]
 
+                # optional mod wheel caps `velocity_mod` field. Only one slot
+                # is updated at a time, so all slots share one comparator.
+                velocity_capped = Signal(8)
+                if self.velocity_mod:
+                    velocity = Array(self.o)[ix_update].velocity
+                    m.d.comb += velocity_capped.eq(
+                        Mux(last_cc1 < velocity, last_cc1, velocity))
+
                 # latch to correct output register
                 with m.Switch(ix_update):
                     for n in range(self.max_voices):
                         with m.Case(n):
                             # latch linear frequency + pitch bend
                             m.d.sync += self.o[n].freq_inc.eq(calculated_freq)
-                            # optional mod wheel caps `velocity_mod` field.
                             if self.velocity_mod:
-                                with m.If(last_cc1 < self.o[n].velocity):
-                                    m.d.sync += self.o[n].velocity_mod.eq(last_cc1)
-                                with m.Else():
-                                    m.d.sync += self.o[n].velocity_mod.eq(self.o[n].velocity)
+                                m.d.sync += self.o[n].velocity_mod.eq(velocity_capped)
 
                 # Check if we've updated every slot.
                 m.d.sync += ix_update.eq(ix_update + 1)
@@ -407,29 +430,25 @@ class MonoMidiCV(wiring.Component):
             self.i_midi.ready.eq(1),
         ]
 
-        # Create a LUT from midi note to voltage (output ASQ).
-        lut = []
-        for i in range(128):
-            volts_per_note = 1.0/12.0
-            volts = i*volts_per_note - 5
-            # convert volts to audio sample
-            x = volts/(2**15/4000)
-            lut.append(fixed.Const(x, shape=ASQ)._value)
+        # LUT from midi note to voltage (output ASQ).
+        lut = _NOTE_VOLTS_LUT
 
         # Store it in a memory where the address is the midi note,
         # and the data coming out is directly routed to V/Oct out.
         m.submodules.mem = mem = Memory(
             shape=signed(ASQ.as_shape().width), depth=len(lut), init=lut)
         rport = mem.read_port()
+
+        # The LUT is only read on NOTE_ON. The read port holds its data
+        # between reads, so it can be routed straight out to our note payload.
+        msg = self.i_midi.payload
         m.d.comb += [
-            rport.en.eq(1),
+            rport.addr.eq(msg.midi_payload.note_on.note),
+            rport.en.eq(self.i_midi.valid & (msg.midi_type == MessageType.NOTE_ON)),
+            self.o.payload[1].as_value().eq(rport.data),
         ]
 
-        # Route memory straight out to our note payload.
-        m.d.sync += self.o.payload[1].as_value().eq(rport.data),
-
         with m.If(self.i_midi.valid):
-            msg = self.i_midi.payload
             with m.Switch(msg.midi_type):
                 with m.Case(MessageType.NOTE_ON):
                     m.d.sync += [
@@ -437,9 +456,7 @@ class MonoMidiCV(wiring.Component):
                         self.o.payload[0].eq(fixed.Const(0.5, shape=ASQ)),
                         # Set velocity output
                         self.o.payload[2].as_value().eq(
-                            msg.midi_payload.note_on.velocity << 8),
-                        # Set note index in LUT
-                        rport.addr.eq(msg.midi_payload.note_on.note),
+                            Cat(Const(0, 8), msg.midi_payload.note_on.velocity)),
                     ]
                 with m.Case(MessageType.NOTE_OFF):
                     # Zero gate and velocity on NOTE_OFF
@@ -452,7 +469,7 @@ class MonoMidiCV(wiring.Component):
                     with m.If(msg.midi_payload.control_change.controller_number == 1):
                         m.d.sync += [
                             self.o.payload[3].as_value().eq(
-                                msg.midi_payload.control_change.data << 8),
+                                Cat(Const(0, 8), msg.midi_payload.control_change.data)),
                         ]
 
         return m
@@ -29,6 +29,10 @@ class Peripheral(wiring.Component):
 
     Default region name is "ram" as that is accepted by luna-soc SVD generation
     as a memory region, in the future "psram" might also be acceptable.
+
+    :py:`training_done` is asserted (and stays asserted) once the memory registers
+    are initialized and read leveling is complete. Bus transactions are only
+    serviced after this point.
     """
 
     def __init__(self, *, size, data_width=32, granularity=8, name="psram"):
@@ -69,6 +73,8 @@ class Peripheral(wiring.Component):
         self._hram_arbiter.add(flipped(self.bus))
         self.shared_bus = self._hram_arbiter.bus
 
+        self.training_done = Signal()
+
     def add_master(self, bus):
         self._hram_arbiter.add(bus)
 
@@ -167,6 +173,7 @@ class Peripheral(wiring.Component):
 
             # Training complete, now we can accept transactions.
             with m.State('IDLE'):
+                m.d.sync += self.training_done.eq(1)
                 with m.If(self.shared_bus.cyc & self.shared_bus.stb & psram.idle):
                     m.d.sync += [
                         psram.start_transfer          .eq(1),
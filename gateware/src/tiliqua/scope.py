@@ -6,7 +6,7 @@ Multi-channel oscilloscope and vectorscope SoC peripherals.
 """
 
 from amaranth                                    import *
-from amaranth.lib                                import wiring, data, stream
+from amaranth.lib                                import wiring, data, stream, enum
 from amaranth.lib.wiring                         import In, Out, flipped, connect
 
 from amaranth_soc                                import csr
@@ -124,8 +124,18 @@ class ScopeTracePeripheral(wiring.Component):
         self.timebase = Signal(shape=dsp.ASQ)
         self.trigger_lvl = Signal(shape=dsp.ASQ)
         self.trigger_always = Signal()
+        self.ypos = [Signal.like(s.y_offset) for s in self.strokes]
 
         regs = csr.Builder(addr_width=6, data_width=8)
+        self._add_registers(regs)
+
+        self._bridge = csr.Bridge(regs.as_memory_map())
+        super().__init__({
+            "bus": In(csr.Signature(addr_width=regs.addr_width, data_width=regs.data_width)),
+        })
+        self.bus.memory_map = self._bridge.bus.memory_map
+
+    def _add_registers(self, regs):
         self._en             = regs.add("en",             self.Enable(),        offset=0x0)
         self._hue            = regs.add("hue",            self.Hue(),           offset=0x4)
         self._intensity      = regs.add("intensity",      self.Intensity(),     offset=0x8)
@@ -136,12 +146,6 @@ class ScopeTracePeripheral(wiring.Component):
         self._trigger_lvl    = regs.add("trigger_lvl",    self.TriggerLevel(),  offset=0x1C)
         self._ypos           = [regs.add(f"ypos{i}",      self.YPosition(),     offset=(0x20+i*4)) for i in range(4)]
 
-        self._bridge = csr.Bridge(regs.as_memory_map())
-        super().__init__({
-            "bus": In(csr.Signature(addr_width=regs.addr_width, data_width=regs.data_width)),
-        })
-        self.bus.memory_map = self._bridge.bus.memory_map
-
     def elaborate(self, platform):
         m = Module()
 
@@ -150,8 +154,11 @@ class ScopeTracePeripheral(wiring.Component):
 
         m.submodules += self.strokes
 
-        for s in self.strokes:
-            m.d.comb += s.enable.eq(self.en & self.soc_en)
+        for s, ypos in zip(self.strokes, self.ypos):
+            m.d.comb += [
+                s.enable.eq(self.en & self.soc_en),
+                s.y_offset.eq(ypos),
+            ]
 
         # Scope and trigger
         # Ch0 is routed through trigger, the rest are not.
@@ -178,8 +185,9 @@ class ScopeTracePeripheral(wiring.Component):
         m.submodules.rampsplit4 = rampsplit4 = dsp.Split(4, replicate=True, source=ramp.o)
 
         # Rasterize ch0: Ramp => X, Audio => Y
-        m.submodules.ch0_merge4 = ch0_merge4 = dsp.Merge(4, sink=self.strokes[0].i)
+        m.submodules.ch0_merge4 = ch0_merge4 = dsp.Merge(4)
         ch0_merge4.wire_valid(m, [2, 3])
+        wiring.connect(m, ch0_merge4.o, self.strokes[0].i)
         wiring.connect(m, rampsplit4.o[0], ch0_merge4.i[0])
         wiring.connect(m, irep2.o[1], ch0_merge4.i[1])
 
@@ -217,7 +225,7 @@ class ScopeTracePeripheral(wiring.Component):
 
         for i, ypos_reg in enumerate(self._ypos):
             with m.If(ypos_reg.f.ypos.w_stb):
-                m.d.sync += self.strokes[i].y_offset.eq(ypos_reg.f.ypos.w_data)
+                m.d.sync += self.ypos[i].eq(ypos_reg.f.ypos.w_data)
 
         with m.If(self._en.f.enable.w_stb):
             m.d.sync += self.soc_en.eq(self._en.f.enable.w_data)
@@ -227,3 +235,65 @@ class ScopeTracePeripheral(wiring.Component):
 
         return m
 
+
+class TracePeripheral(ScopeTracePeripheral):
+
+    """
+    Combined oscilloscope / vectorscope peripheral.
+
+    Only one of :py:`ScopeTracePeripheral` or :py:`VectorTracePeripheral`
+    is normally drawing at a time. This one draws either, selected by the
+    :py:`mode` register, so that a single set of :py:`Stroke` rasterizers
+    (and PSRAM bus masters) is instantiated for both.
+
+    In scope mode, this behaves exactly as :py:`ScopeTracePeripheral`, with
+    the same register layout. In vector mode, the input stream is upsampled
+    and drawn (centered) by stroke 0 as in :py:`VectorTracePeripheral`, and
+    the other strokes are idle.
+    """
+
+    class Mode(enum.Enum, shape=unsigned(1)):
+        SCOPE  = 0
+        VECTOR = 1
+
+    class ModeReg(csr.Register, access="w"):
+        mode: csr.Field(csr.action.W, unsigned(1))
+
+    def __init__(self, fb_base, fb_size, bus_dma, fs=192000, n_upsample=4, **kwargs):
+        # Vector mode upsampling, all channels share one resampler.
+        self.vector_resample = dsp.Resample(fs_in=fs, n_up=n_upsample, m_down=1, n_channels=4)
+        self.mode = Signal(self.Mode)
+        super().__init__(fb_base, fb_size, bus_dma, **kwargs)
+        # Routed to either the scope or the vector path, depending on the mode.
+        self.i = stream.Signature(data.ArrayLayout(dsp.ASQ, 4)).flip().create()
+
+    def _add_registers(self, regs):
+        super()._add_registers(regs)
+        self._mode = regs.add("mode", self.ModeReg(), offset=0x30)
+
+    def elaborate(self, platform):
+        m = super().elaborate(platform)
+
+        m.submodules.vector_resample = self.vector_resample
+
+        vector = Signal()
+        m.d.comb += vector.eq(self.mode == self.Mode.VECTOR)
+
+        # Mode select. The unused path is left stalled.
+        with m.If(vector):
+            wiring.connect(m, wiring.flipped(self.i), self.vector_resample.i)
+        with m.Else():
+            wiring.connect(m, wiring.flipped(self.i), self.isplit4.i)
+
+        # In vector mode, these take priority over the scope connections made
+        # above, which see no input in this mode.
+        with m.If(vector):
+            wiring.connect(m, self.vector_resample.o, self.strokes[0].i)
+            m.d.comb += self.strokes[0].y_offset.eq(0)
+            for s in self.strokes[1:]:
+                m.d.comb += s.enable.eq(0)
+
+        with m.If(self._mode.f.mode.w_stb):
+            m.d.sync += self.mode.eq(self._mode.f.mode.w_data)
+
+        return m
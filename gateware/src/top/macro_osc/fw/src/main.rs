@@ -46,6 +46,10 @@ struct App<'a> {
     patch: Patch,
     modulations: Modulations,
     ui: UI,
+    // Ping-pong buffers of packed stereo frames, copied to the
+    // audio FIFOs by the DMA engine in the AUDIO_FIFO peripheral.
+    dma_buf: [[u32; BLOCK_SIZE]; 2],
+    dma_ix: usize,
 }
 
 impl<'a> App<'a> {
@@ -73,6 +77,8 @@ impl<'a> App<'a> {
             modulations: Modulations::default(),
             ui: UI::new(opts, TIMER0_ISR_PERIOD_MS, encoder,
                         pca9635, pmod),
+            dma_buf: [[0u32; BLOCK_SIZE]; 2],
+            dma_ix: 0,
         }
     }
 }
@@ -151,8 +157,13 @@ fn timer0_handler(app: &Mutex<RefCell<App>>) {
         let mut out = [0.0f32; BLOCK_SIZE];
         let mut aux = [0.0f32; BLOCK_SIZE];
 
+        // FIFO level, mirrored in the audio FIFO memory region so polling
+        // it is a single bus cycle instead of a CSR access.
+        let fifo_len_ptr = (AUDIO_FIFO_MEM_BASE + 0x8) as *const u32;
+        let fifo_len = || unsafe { fifo_len_ptr.read_volatile() as usize };
+
         let mut n_attempts = 0;
-        while (audio_fifo.fifo_len().read().bits() as usize) < AUDIO_FIFO_ELASTIC_SZ - BLOCK_SIZE {
+        while fifo_len() < AUDIO_FIFO_ELASTIC_SZ - BLOCK_SIZE {
             n_attempts += 1;
             if n_attempts > 10 {
                 // TODO set underrun flag
@@ -160,13 +171,21 @@ fn timer0_handler(app: &Mutex<RefCell<App>>) {
             }
             app.voice
                .render(&patch, &modulations, &mut out, &mut aux);
+            // The DMA engine can queue 1 block while copying another. Once the
+            // queue slot is free, the block submitted before the last one has
+            // been copied, so its buffer may be reused.
+            while audio_fifo.dma_busy().read().bits() == 1 { }
+            let ix = app.dma_ix;
+            let buf = &mut app.dma_buf[ix];
             for i in 0..BLOCK_SIZE {
-                unsafe {
-                    let fifo_base = AUDIO_FIFO_MEM_BASE as *mut u32;
-                    *fifo_base = f32_to_i32((out[i]*16000.0f32).to_bits()) as u32;
-                    *fifo_base.add(1) = f32_to_i32((aux[i]*16000.0f32).to_bits()) as u32;
-                }
+                // Both channels are packed into a single word.
+                let o = f32_to_i32((out[i]*16000.0f32).to_bits()) as u32;
+                let a = f32_to_i32((aux[i]*16000.0f32).to_bits()) as u32;
+                buf[i] = (o & 0xFFFF) | (a << 16);
             }
+            audio_fifo.dma_addr().write(|w| unsafe { w.addr().bits(buf.as_ptr() as u32) } );
+            audio_fifo.dma_len().write(|w| unsafe { w.length().bits(BLOCK_SIZE as u16) } );
+            app.dma_ix = ix ^ 1;
         }
 
     });
@@ -204,7 +223,6 @@ fn main() -> ! {
         framebuffer_base: PSRAM_FB_BASE as *mut u32,
     };
 
-    let vscope  = peripherals.VECTOR_PERIPH;
     let scope  = peripherals.SCOPE_PERIPH;
 
     let mut video = Video0::new(peripherals.VIDEO_PERIPH);
@@ -270,8 +288,9 @@ fn main() -> ! {
         //
 
         scope.en().write(|w| w.enable().bit(true) );
-        vscope.en().write(|w| w.enable().bit(false) );
+        scope.mode().write(|w| w.mode().bit(false) );
         let mut first = true;
+        let mut vector = false;
 
 
         //
@@ -303,18 +322,31 @@ fn main() -> ! {
             video.set_persist(opts.beam.persist.value);
             video.set_decay(opts.beam.decay.value);
 
+            // Scope and vectorscope share the same peripheral, which only
+            // holds the settings of the one currently being drawn. This is
+            // the last of the 2 screens to be selected.
+            if opts.screen.value == opts::Screen::Vector {
+                vector = true;
+            }
+
+            if opts.screen.value == opts::Screen::Scope {
+                vector = false;
+            }
+
             unsafe {
-                vscope.hue().write(|w| w.hue().bits(opts.beam.hue.value+4));
-                vscope.intensity().write(|w| w.intensity().bits(opts.beam.intensity.value));
-                vscope.xscale().write(|w| w.xscale().bits(opts.vector.xscale.value));
-                vscope.yscale().write(|w| w.yscale().bits(opts.vector.yscale.value));
+                if vector {
+                    scope.hue().write(|w| w.hue().bits(opts.beam.hue.value+4));
+                    scope.xscale().write(|w| w.xscale().bits(opts.vector.xscale.value));
+                    scope.yscale().write(|w| w.yscale().bits(opts.vector.yscale.value));
+                } else {
+                    scope.hue().write(|w| w.hue().bits(opts.beam.hue.value+6));
+                    scope.xscale().write(|w| w.xscale().bits(opts.scope.xscale.value));
+                    scope.yscale().write(|w| w.yscale().bits(opts.scope.yscale.value));
+                }
 
-                scope.hue().write(|w| w.hue().bits(opts.beam.hue.value+6));
                 scope.intensity().write(|w| w.intensity().bits(opts.beam.intensity.value));
 
                 scope.trigger_lvl().write(|w| w.trigger_level().bits(opts.scope.trigger_lvl.value as u16));
-                scope.xscale().write(|w| w.xscale().bits(opts.scope.xscale.value));
-                scope.yscale().write(|w| w.yscale().bits(opts.scope.yscale.value));
                 scope.timebase().write(|w| w.timebase().bits(opts.scope.timebase.value));
 
                 scope.ypos0().write(|w| w.ypos().bits(opts.scope.ypos0.value as u16));
@@ -326,15 +358,7 @@ fn main() -> ! {
             scope.trigger_always().write(
                 |w| w.trigger_always().bit(opts.scope.trigger_mode.value == opts::TriggerMode::Always) );
 
-            if opts.screen.value == opts::Screen::Vector {
-                scope.en().write(|w| w.enable().bit(false) );
-                vscope.en().write(|w| w.enable().bit(true) );
-            }
-
-            if opts.screen.value == opts::Screen::Scope {
-                scope.en().write(|w| w.enable().bit(true) );
-                vscope.en().write(|w| w.enable().bit(false) );
-            }
+            scope.mode().write(|w| w.mode().bit(vector) );
 
             first = false;
         }
@@ -32,7 +32,9 @@ Jack mapping:
 There is quite some heavy compute here and RAM usage, as a result,
 the firmware and buffers are too big to fit in BRAM. In this demo,
 the firmware is in memory-mapped SPI flash and the DSP buffers are
-allocated from external PSRAM.
+allocated from external PSRAM. Instruction fetches from flash go through
+the softcore's I-cache (2KiB, 32-byte lines), so the inner DSP loops are
+mostly served from BRAM after their first iteration.
 
 Credits to Emilie Gillet for the original Plaits module and firmware.
 
@@ -43,6 +45,7 @@ The Rust port is what is running on this softcore.
 """
 
 import logging
+import math
 import os
 import sys
 
@@ -64,34 +67,98 @@ from tiliqua.cli                                 import top_level_cli
 from tiliqua.eurorack_pmod                       import ASQ
 
 
-# Simple 2-fifo DMA peripheral for writing glitch-free audio from a softcore.
+# Simple stereo FIFO + DMA peripheral for writing glitch-free audio from a softcore.
+# With 'n_channels=1', only bits [0:16] of each frame are used.
+#
+# Samples may be written to the FIFOs in 2 ways:
+#  - By the softcore directly, 1 store per stereo frame into the 'wb_bus' region.
+#    Loads from offset 0x8 of this region return the FIFO level.
+#  - By a small DMA engine, which copies blocks of stereo frames from memory.
+#    The softcore submits a block by writing 'dma_addr', then 'dma_len'. While
+#    one block is being copied, one more may be queued ('dma_busy' is set while
+#    this queue slot is occupied), so the softcore can ping-pong between 2 buffers.
+#    A bus error aborts the current block and sets the sticky 'dma_error' flag.
 class AudioFIFOPeripheral(wiring.Component):
 
     class FifoLenReg(csr.Register, access="r"):
         fifo_len: csr.Field(csr.action.R, unsigned(16))
 
-    def __init__(self, fifo_sz=4*4, fifo_data_width=32, granularity=8, elastic_sz=64*3):
+    class DmaAddrReg(csr.Register, access="w"):
+        addr: csr.Field(csr.action.W, unsigned(32))
+
+    class DmaLenReg(csr.Register, access="w"):
+        length: csr.Field(csr.action.W, unsigned(16))
+
+    class DmaBusyReg(csr.Register, access="r"):
+        busy: csr.Field(csr.action.R, unsigned(1))
+
+    class OverflowReg(csr.Register, access="rw"):
+        overflow: csr.Field(csr.action.RW1C, unsigned(1))
+
+    class DmaErrorReg(csr.Register, access="rw"):
+        error: csr.Field(csr.action.RW1C, unsigned(1))
+
+    def __init__(self, fifo_sz=4*4, fifo_data_width=32, granularity=8, fs_in=12000,
+                 dsp_jitter_ms=8, elastic_sz=None, dma_addr_width=30, dsp_domain="audio",
+                 n_channels=2):
+        if n_channels not in (1, 2):
+            raise ValueError(f"A frame must fit in a single 32-bit word, n_channels={n_channels}")
+
         regs = csr.Builder(addr_width=6, data_width=8)
 
-        # Out and Aux FIFOs
+        # Out and Aux samples share a FIFO, each word is a stereo frame.
+        # Packing both channels into one word uses the full width of the
+        # BRAMs backing the FIFO, rather than 2 half-empty ones.
+        # Unless specified, this is sized to absorb the worst-case jitter of
+        # the softcore DSP loop, with a 2x margin. A bigger FIFO costs BRAM
+        # and adds latency from CV/UI to audio.
+        #
+        # The FIFO also crosses into 'dsp_domain', where the resamplers run.
+        # They only need to keep up with 48kHz, so they are kept off the
+        # (faster) softcore clock and out of its critical paths. The
+        # underlying depth is rounded up to a power of 2, 'elastic_sz'
+        # remains the fill level targeted by the softcore.
+        if elastic_sz is None:
+            elastic_sz = math.ceil(dsp_jitter_ms * fs_in / 1000 * 2)
+        self.fs_in = fs_in
         self.elastic_sz = elastic_sz
-        self._fifo0 = fifo.SyncFIFOBuffered(
-            width=ASQ.as_shape().width, depth=elastic_sz)
-        self._fifo1 = fifo.SyncFIFOBuffered(
-            width=ASQ.as_shape().width, depth=elastic_sz)
-
-        # Amount of elements in fifo0, used by softcore for scheduling.
+        self.dsp_domain = dsp_domain
+        self.n_channels = n_channels
+        self.frame_layout = data.ArrayLayout(ASQ, n_channels)
+        self._fifo = fifo.AsyncFIFO(
+            width=self.frame_layout.as_shape().width, depth=elastic_sz,
+            w_domain="sync", r_domain=dsp_domain)
+
+        # Amount of frames in the fifo, used by softcore for scheduling.
         self._fifo_len = regs.add(f"fifo_len", self.FifoLenReg(), offset=0x4)
 
+        # DMA block submission.
+        self._dma_addr = regs.add("dma_addr", self.DmaAddrReg(), offset=0x8)
+        self._dma_len  = regs.add("dma_len",  self.DmaLenReg(),  offset=0xC)
+        self._dma_busy = regs.add("dma_busy", self.DmaBusyReg(), offset=0x10)
+
+        # Sticky flag, set if the softcore stored a frame while the FIFOs were full
+        # (the store is stalled until there is space). Write 1 to clear.
+        self._overflow = regs.add("overflow", self.OverflowReg(), offset=0x14)
+
+        # Sticky flag, set if a DMA read ended in a bus error. The rest of that
+        # block is dropped (nothing is pushed to the FIFOs). Write 1 to clear.
+        self._dma_error = regs.add("dma_error", self.DmaErrorReg(), offset=0x18)
+
         self._bridge = csr.Bridge(regs.as_memory_map())
 
+        # We are a DMA master (reading stereo frames from memory).
+        self.dma_bus = wishbone.Interface(addr_width=dma_addr_width, data_width=32, granularity=8,
+                                          features={"cti", "bte", "err"})
+
         mem_depth  = (fifo_sz * granularity) // fifo_data_width
         super().__init__({
             "csr_bus": In(csr.Signature(addr_width=regs.addr_width, data_width=regs.data_width)),
             "wb_bus":  In(wishbone.Signature(addr_width=exact_log2(mem_depth),
                                              data_width=fifo_data_width,
                                              granularity=granularity)),
-            "stream": Out(stream.Signature(data.ArrayLayout(ASQ, 4))),
+            # Out (and Aux) channels at 48kHz.
+            "stream": Out(stream.Signature(self.frame_layout)),
         })
 
         self.csr_bus.memory_map = self._bridge.bus.memory_map
@@ -106,44 +173,128 @@ class AudioFIFOPeripheral(wiring.Component):
         m = Module()
         m.submodules.bridge = self._bridge
 
-        m.submodules._fifo0 = self._fifo0
-        m.submodules._fifo1 = self._fifo1
+        m.submodules._fifo = self._fifo
 
         connect(m, flipped(self.csr_bus), self._bridge.bus)
 
-        # Route writes to DMA region to audio FIFOs
-        wstream0 = self._fifo0.w_stream
-        wstream1 = self._fifo1.w_stream
-        with m.If(self.wb_bus.cyc & self.wb_bus.stb & self.wb_bus.we):
-            with m.Switch(self.wb_bus.adr):
-                with m.Case(0):
-                    m.d.comb += [
-                        self.wb_bus.ack.eq(1),
-                        wstream0.valid.eq(1),
-                        wstream0.payload.eq(self.wb_bus.dat_w),
+        # Each 32-bit word carries a sample for both channels, so a stereo
+        # frame is a single bus cycle. Bits [0:16] are channel 0 (out), bits
+        # [16:32] are channel 1 (aux).
+        frame       = Signal(32)
+        frame_valid = Signal()
+        wstream = self._fifo.w_stream
+        m.d.comb += [
+            wstream.valid.eq(frame_valid),
+            wstream.payload.eq(frame),
+        ]
+
+        # DMA engine. 'next' is the queued block, 'cur' the one being copied.
+        dma_addr   = Signal(32)
+        next_addr  = Signal(32)
+        next_len   = Signal(16)
+        next_valid = Signal()
+        cur_adr    = Signal(len(self.dma_bus.adr))
+        cur_len    = Signal(16)
+        dma_frame  = Signal(32)
+        dma_push   = Signal()
+        dma_done   = Signal()
+
+        m.d.comb += self._dma_busy.f.busy.r_data.eq(next_valid)
+
+        with m.If(self._dma_addr.f.addr.w_stb):
+            m.d.sync += dma_addr.eq(self._dma_addr.f.addr.w_data)
+
+        with m.If(self._dma_len.f.length.w_stb & ~next_valid):
+            m.d.sync += [
+                next_addr.eq(dma_addr),
+                next_len.eq(self._dma_len.f.length.w_data),
+                next_valid.eq(1),
+            ]
+
+        bus = self.dma_bus
+        with m.FSM():
+            with m.State('IDLE'):
+                with m.If(next_valid):
+                    m.d.sync += [
+                        cur_adr.eq(next_addr[2:]),
+                        cur_len.eq(next_len),
+                        next_valid.eq(0),
                     ]
-                with m.Case(1):
-                    m.d.comb += [
-                        self.wb_bus.ack.eq(1),
-                        wstream1.valid.eq(1),
-                        wstream1.payload.eq(self.wb_bus.dat_w),
+                    with m.If(next_len != 0):
+                        m.next = 'READ'
+            with m.State('READ'):
+                m.d.comb += [
+                    bus.stb.eq(1),
+                    bus.cyc.eq(1),
+                    bus.we.eq(0),
+                    bus.sel.eq(2**(bus.data_width//8)-1),
+                    bus.adr.eq(cur_adr),
+                ]
+                with m.If(bus.err):
+                    m.d.comb += self._dma_error.f.error.set.eq(1)
+                    m.next = 'IDLE'
+                with m.Elif(bus.ack):
+                    m.d.sync += dma_frame.eq(bus.dat_r)
+                    m.next = 'PUSH'
+            with m.State('PUSH'):
+                m.d.comb += dma_push.eq(1)
+                with m.If(dma_done):
+                    m.d.sync += [
+                        cur_adr.eq(cur_adr + 1),
+                        cur_len.eq(cur_len - 1),
                     ]
-
-        m.d.comb += self._fifo_len.f.fifo_len.r_data.eq(self._fifo0.level)
-
-        # Resample 12kHz to 48kHz
-        m.submodules.resample_up0 = resample_up0 = dsp.Resample(
-                fs_in=12000, n_up=4, m_down=1)
-        m.submodules.resample_up1 = resample_up1 = dsp.Resample(
-                fs_in=12000, n_up=4, m_down=1)
-        wiring.connect(m, self._fifo0.r_stream, resample_up0.i)
-        wiring.connect(m, self._fifo1.r_stream, resample_up1.i)
-
-        # Last 2 outputs
-        m.submodules.merge = merge = dsp.Merge(4, wiring.flipped(self.stream))
-        merge.wire_valid(m, [0, 1])
-        wiring.connect(m, resample_up0.o, merge.i[2])
-        wiring.connect(m, resample_up1.o, merge.i[3])
+                    with m.If(cur_len == 1):
+                        m.next = 'IDLE'
+                    with m.Else():
+                        m.next = 'READ'
+
+        # Route writes to the fixed memory region (softcore stores) to the audio
+        # FIFOs. These take priority, the DMA engine waits for the next free cycle.
+        # If the FIFOs are full, the store stalls rather than dropping a frame,
+        # which would desynchronize the channels.
+        with m.If(self.wb_bus.cyc & self.wb_bus.stb & self.wb_bus.we):
+            m.d.comb += [
+                self.wb_bus.ack.eq(wstream.ready),
+                frame_valid.eq(1),
+                frame.eq(self.wb_bus.dat_w),
+                self._overflow.f.overflow.set.eq(~wstream.ready),
+            ]
+        with m.Elif(dma_push):
+            m.d.comb += [
+                dma_done.eq(wstream.ready),
+                frame_valid.eq(dma_done),
+                frame.eq(dma_frame),
+            ]
+
+        # FIFO level is also readable at offset 0x8 of the fixed memory region.
+        # Polling it here is a single bus cycle, rather than going through the
+        # CSR bridge. The 'fifo_len' CSR mirrors the same value.
+        with m.If(self.wb_bus.cyc & self.wb_bus.stb & ~self.wb_bus.we):
+            m.d.comb += self.wb_bus.ack.eq(1)
+            with m.If(self.wb_bus.adr == 2):
+                m.d.comb += self.wb_bus.dat_r.eq(self._fifo.w_level)
+
+        m.d.comb += self._fifo_len.f.fifo_len.r_data.eq(self._fifo.w_level)
+
+        # Resample 12kHz to 48kHz. All channels share a single resampler,
+        # so filter taps and the multiplier are only instantiated once.
+        # Cascade of 2x half-band interpolators. Every second tap of
+        # a half-band filter is zero and skipped, and the second stage
+        # can use a shorter filter as its transition band is wider.
+        to_dsp = DomainRenamer({"sync": self.dsp_domain})
+        m.submodules.resample_up0 = resample_up0 = to_dsp(dsp.Resample(
+                fs_in=self.fs_in, n_up=2, m_down=1, bw=0.5, filter_order=11, n_channels=self.n_channels))
+        m.submodules.resample_up1 = resample_up1 = to_dsp(dsp.Resample(
+                fs_in=self.fs_in*2, n_up=2, m_down=1, bw=0.5, filter_order=7, n_channels=self.n_channels))
+        wiring.connect(m, self._fifo.r_stream, resample_up0.i)
+        wiring.connect(m, resample_up0.o, resample_up1.i)
+
+        # Back to the 'sync' domain for the audio and plotting streams.
+        m.submodules.resample_cdc = resample_cdc = fifo.AsyncFIFOBuffered(
+            width=self.frame_layout.as_shape().width, depth=4,
+            w_domain=self.dsp_domain, r_domain="sync")
+        wiring.connect(m, resample_up1.o, resample_cdc.w_stream)
+        wiring.connect(m, resample_cdc.r_stream, wiring.flipped(self.stream))
 
         return m
 
@@ -159,29 +310,27 @@ class MacroOscSoc(TiliquaSoc):
         fb_size = (self.video.fb_hsize, self.video.fb_vsize)
 
         # WARN: TiliquaSoc ends at 0x00000900
-        self.vector_periph_base  = 0x00001000
         self.scope_periph_base   = 0x00001100
         self.audio_fifo_csr_base = 0x00001200
-        # offset 0x0 is FIFO0, offset 0x4 is FIFO1
+        # offset 0x0: Out sample in bits [0:16], Aux sample in bits [16:32] (write)
+        # offset 0x8: FIFO level, in stereo frames (read)
         self.audio_fifo_mem_base = 0xa0000000
 
-        self.vector_periph = scope.VectorTracePeripheral(
-            fb_base=self.video.fb_base,
-            fb_size=fb_size,
-            bus_dma=self.psram_periph,
-            video_rotate_90=self.video_rotate_90)
-        self.csr_decoder.add(self.vector_periph.bus, addr=self.vector_periph_base, name="vector_periph")
-
-        self.scope_periph = scope.ScopeTracePeripheral(
+        # Scope and vectorscope share the same rasterizers, only one is shown at a time.
+        self.scope_periph = scope.TracePeripheral(
             fb_base=self.video.fb_base,
             fb_size=fb_size,
             bus_dma=self.psram_periph,
             video_rotate_90=self.video_rotate_90)
         self.csr_decoder.add(self.scope_periph.bus, addr=self.scope_periph_base, name="scope_periph")
 
-        self.audio_fifo = AudioFIFOPeripheral()
+        # Worst case is a bit over 1 timer ISR period (5ms) between refills.
+        self.audio_fifo = AudioFIFOPeripheral(
+            fs_in=12000, dsp_jitter_ms=8,
+            dma_addr_width=self.wb_arbiter.bus.addr_width)
         self.csr_decoder.add(self.audio_fifo.csr_bus, addr=self.audio_fifo_csr_base, name="audio_fifo")
         self.wb_decoder.add(self.audio_fifo.wb_bus, addr=self.audio_fifo_mem_base, name="audio_fifo")
+        self.wb_arbiter.add(self.audio_fifo.dma_bus)
 
         # TODO: take this from parsed memory region list
         self.add_rust_constant(
@@ -196,8 +345,6 @@ class MacroOscSoc(TiliquaSoc):
 
         m = Module()
 
-        m.submodules += self.vector_periph
-
         m.submodules += self.scope_periph
 
         m.submodules += self.audio_fifo
@@ -210,31 +357,38 @@ class MacroOscSoc(TiliquaSoc):
 
         self.scope_periph.source = astream.istream
 
-        wiring.connect(m, self.audio_fifo.stream, astream.ostream)
+        # Out and Aux drive the last 2 outputs, the first 2 are left at 0.
+        dsp.channel_remap(m, self.audio_fifo.stream, astream.ostream, {0: 2, 1: 3})
 
-        # Extra FIFO between audio out stream and plotting components
-        # This FIFO does not block the audio stream.
+        # Skid buffer between audio out stream and plotting components.
+        # Plotting drains at audio rate, so a single entry is enough to
+        # keep it from back-pressuring the audio stream.
 
-        m.submodules.plot_fifo = plot_fifo = fifo.SyncFIFOBuffered(
-            width=data.ArrayLayout(ASQ, 4).as_shape().width, depth=16)
+        m.submodules.plot_fifo = plot_fifo = dsp.SkidBuffer(
+            width=data.ArrayLayout(ASQ, 4).as_shape().width)
 
-        # Route audio outputs 2/3 to plotting stream (scope / vector)
+        # Route audio outputs 2/3 to plotting stream (scope / vector), one plot
+        # sample per audio sample transferred to the codec. The plotting path
+        # never back-pressures the audio stream, its 'ready' is not used here.
+        audio_xfer = Signal()
+        m.d.comb += audio_xfer.eq(self.audio_fifo.stream.valid & astream.ostream.ready)
         m.d.comb += [
-            plot_fifo.w_stream.valid.eq(self.audio_fifo.stream.valid & astream.ostream.ready),
-            plot_fifo.w_stream.payload[0:16] .eq(self.audio_fifo.stream.payload[2]),
-            plot_fifo.w_stream.payload[16:32].eq(self.audio_fifo.stream.payload[3]),
+            plot_fifo.w_stream.valid.eq(audio_xfer),
+            plot_fifo.w_stream.payload[0:16] .eq(self.audio_fifo.stream.payload[0]),
+            plot_fifo.w_stream.payload[16:32].eq(self.audio_fifo.stream.payload[1]),
         ]
 
-        # Switch to use scope or vectorscope
-        with m.If(self.scope_periph.soc_en):
-            wiring.connect(m, plot_fifo.r_stream, self.scope_periph.i)
-        with m.Else():
-            wiring.connect(m, plot_fifo.r_stream, self.vector_periph.i)
+        wiring.connect(m, plot_fifo.r_stream, self.scope_periph.i)
 
         # Memory controller hangs if we start making requests to it straight away.
-        with m.If(self.permit_bus_traffic):
-            m.d.sync += self.vector_periph.en.eq(1)
-            m.d.sync += self.scope_periph.en.eq(1)
+        # The plotting DMA masters only start once PSRAM training has completed
+        # and bus traffic has been permitted for a further 2^16 cycles.
+        plot_en_delay = Signal(16)
+        with m.If(self.permit_bus_traffic & self.psram_periph.training_done):
+            with m.If(plot_en_delay != 2**16-1):
+                m.d.sync += plot_en_delay.eq(plot_en_delay + 1)
+            with m.Else():
+                m.d.sync += self.scope_periph.en.eq(1)
 
         return m
 
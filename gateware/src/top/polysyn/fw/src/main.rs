@@ -183,11 +183,10 @@ fn main() -> ! {
 
         loop {
 
-            let (opts, notes, cutoffs) = critical_section::with(|cs| {
+            let (opts, (notes, cutoffs)) = critical_section::with(|cs| {
                 let app = app.borrow_ref(cs);
                 (app.ui.opts.clone(),
-                 app.synth.voice_notes().clone(),
-                 app.synth.voice_cutoffs().clone())
+                 app.synth.voice_notes_cutoffs())
             });
 
             let help_screen: bool = opts.screen.value == Screen::Help;
@@ -35,7 +35,7 @@ from amaranth.lib              import wiring, data, stream
 from amaranth.lib.wiring       import In, Out, connect, flipped
 from amaranth.lib.fifo         import SyncFIFOBuffered
 
-from amaranth_soc              import csr
+from amaranth_soc              import csr, wishbone
 
 from amaranth_future           import fixed
 
@@ -49,28 +49,50 @@ class Diffuser(wiring.Component):
 
     i: In(stream.Signature(data.ArrayLayout(ASQ, 4)))
     o: Out(stream.Signature(data.ArrayLayout(ASQ, 4)))
+    bus: Out(wishbone.Signature(addr_width=22,
+                                data_width=32,
+                                granularity=8,
+                                features={'bte', 'cti'}))
 
-    def __init__(self):
+    def __init__(self, base=0x80000, use_hadamard=False):
         super().__init__()
 
-        # 4 delay lines, backed by 4 independent SRAM banks.
+        # 4 delay lines, backed by 4 different slices of PSRAM address space,
+        # starting at 'base' (clear of the framebuffer at the start of PSRAM).
+        # Each has its own small cache, which bursts reads and writes.
 
-        self.delay_lines = [
-            DelayLine(max_delay=2048),
-            DelayLine(max_delay=4096),
-            DelayLine(max_delay=8192),
-            DelayLine(max_delay=8192),
-        ]
+        self.delay_lines = []
+        for max_delay in [2048, 4096, 8192, 8192]:
+            self.delay_lines.append(DelayLine(
+                max_delay=max_delay,
+                psram_backed=True,
+                addr_width_o=self.bus.addr_width,
+                base=base,
+            ))
+            base += max_delay
+
+        # All delay lines share our top-level bus for read/write operations.
 
-        self.diffuser = delay.Diffuser(self.delay_lines)
+        self._arbiter = wishbone.Arbiter(addr_width=self.bus.addr_width,
+                                         data_width=self.bus.data_width,
+                                         granularity=self.bus.granularity,
+                                         features=self.bus.features)
+        for delayln in self.delay_lines:
+            self._arbiter.add(delayln.bus)
 
-        # Coefficients of this are tweaked by the SoC
+        self.diffuser = delay.Diffuser(self.delay_lines, use_hadamard=use_hadamard)
+
+        # Coefficients of this are tweaked by the SoC (unless fixed, see
+        # `use_hadamard`, in which case SoC writes are ignored).
 
         self.matrix   = self.diffuser.matrix_mix
 
     def elaborate(self, platform):
         m = Module()
 
+        m.submodules.arbiter = self._arbiter
+        wiring.connect(m, self._arbiter.bus, wiring.flipped(self.bus))
+
         dsp.named_submodules(m.submodules, self.delay_lines)
 
         m.submodules.diffuser = self.diffuser
@@ -80,6 +102,91 @@ class Diffuser(wiring.Component):
 
         return m
 
+class DriveShaperLUT(wiring.Component):
+
+    """
+    Waveshaper LUT memory with the output drive (gain) baked in.
+
+    Holds :py:`f(clip(drive*x))` for use by :py:`dsp.WaveShaper(lut_mem=...)`,
+    so the output stage needs no per-sample multiply before the waveshaper.
+
+    Whenever :py:`drive` changes, every LUT entry is recomputed by streaming
+    its :py:`x` through a :py:`dsp.GainVCA` and a :py:`dsp.WaveShaper` holding
+    the exact :py:`f(x)`. This takes well under a millisecond, during which
+    readers may see a mix of old and new entries.
+
+    The LUT memory is initialized with the curve for :py:`drive_init` (also
+    the reset value of :py:`drive`), so it is valid straight out of reset.
+    """
+
+    def __init__(self, lut_function, lut_size=512, drive_init=0,
+                 vca_macp=None, waveshaper_macp=None):
+        self.lut_size = lut_size
+        self.mem = dsp.WaveShaper.lut_memory(
+            lambda x: lut_function(self.drive_clip(drive_init, x)), lut_size)
+        self.vca = dsp.GainVCA(macp=vca_macp)
+        self.waveshaper = dsp.WaveShaper(lut_function=lut_function,
+                                         lut_size=lut_size, macp=waveshaper_macp)
+        super().__init__({
+            "drive": In(unsigned(16), init=drive_init),
+        })
+
+    @staticmethod
+    def drive_clip(drive, x):
+        """
+        :py:`clip(drive*x)` as computed by the rebuild, where a :py:`drive`
+        of 2**14 is a gain of 2.
+        """
+        return min(max(drive * x / 2**(ASQ.f_width-2), -1.0), 1.0)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.mem = self.mem
+        wport = self.mem.write_port()
+
+        m.submodules.vca = vca = self.vca
+        m.submodules.waveshaper = waveshaper = self.waveshaper
+        wiring.connect(m, vca.o, waveshaper.i)
+
+        # drive setting the LUT contents were computed for.
+        lut_drive = Signal.like(self.drive)
+
+        addr = Signal(range(self.lut_size))
+
+        m.d.comb += [
+            # LUT address is the top bits of x (2s complement).
+            vca.i.payload.x.raw().eq(
+                Cat(Const(0, ASQ.as_shape().width - len(addr)), addr)),
+            vca.i.payload.gain.eq(lut_drive << 2),
+            wport.addr.eq(addr),
+            wport.data.eq(waveshaper.o.payload.as_value()),
+        ]
+
+        with m.FSM() as fsm:
+            with m.State('IDLE'):
+                with m.If(lut_drive != self.drive):
+                    m.d.sync += [
+                        lut_drive.eq(self.drive),
+                        addr.eq(0),
+                    ]
+                    m.next = 'FEED'
+            with m.State('FEED'):
+                m.d.comb += vca.i.valid.eq(1)
+                with m.If(vca.i.ready):
+                    m.next = 'WRITE'
+            with m.State('WRITE'):
+                m.d.comb += waveshaper.o.ready.eq(1)
+                with m.If(waveshaper.o.valid):
+                    m.d.comb += wport.en.eq(1)
+                    with m.If(addr == self.lut_size - 1):
+                        m.next = 'IDLE'
+                    with m.Else():
+                        m.d.sync += addr.eq(addr + 1)
+                        m.next = 'FEED'
+
+        return m
+
 class PolySynth(wiring.Component):
 
     N_VOICES = 8
@@ -89,10 +196,23 @@ class PolySynth(wiring.Component):
 
     i_midi: In(stream.Signature(midi.MidiMessage))
 
-    drive: In(unsigned(16))
+    # Reset value matches the firmware's default 'overdrive' setting.
+    drive: In(unsigned(16), init=16384)
     reso: In(unsigned(16))
 
-    voice_states: Out(midi.MidiVoice).array(N_VOICES)
+    # State of a single voice, selected by index.
+    voice_states_rd_idx: In(range(N_VOICES))
+    voice_states_rd_data: Out(midi.MidiVoice)
+
+    # PSRAM bus used by the diffuser delay lines.
+    bus: Out(wishbone.Signature(addr_width=22,
+                                data_width=32,
+                                granularity=8,
+                                features={'bte', 'cti'}))
+
+    def __init__(self, use_hadamard=False):
+        super().__init__()
+        self.diffuser = Diffuser(use_hadamard=use_hadamard)
 
     def elaborate(self, platform):
         m = Module()
@@ -102,132 +222,144 @@ class PolySynth(wiring.Component):
 
         m.submodules.voice_tracker = voice_tracker = midi.MidiVoiceTracker(
             max_voices=n_voices, velocity_mod=True, zero_velocity_gate=True)
-        # 1 oscillator and filter per oscillator
-        ncos = [dsp.SawNCO(shift=0) for _ in range(n_voices)]
-
-        # All SVFs share the same multiplier tile through a RingMAC.
+        # 1 oscillator and filter per voice. All oscillators share
+        # a single phase accumulator, updated one voice at a time.
+        m.submodules.nco_bank = nco_bank = dsp.SawNCOBank(
+                n_voices=n_voices, shift=0)
+
+        # Voice SVFs, output HPF and output distortion all share the same
+        # multiplier tile through a RingMAC. The diffuser keeps its own
+        # multiplier, as its 8x8 matrix (64 MACs per sample) would take
+        # up most of the ring's time budget by itself.
         m.submodules.server = server = mac.RingMACServer()
-        svfs = [dsp.SVF(macp=server.new_client()) for _ in range(n_voices)]
 
-        m.submodules.merge = merge = dsp.Merge(n_channels=n_voices)
-
-        dsp.named_submodules(m.submodules, ncos)
-        dsp.named_submodules(m.submodules, svfs)
+        # All voice filters are computed by a single SVF core, one voice
+        # after the other, each with its own filter state. The trapezoidal
+        # SVF stays stable for high cutoffs without oversampling.
+        m.submodules.svf = svf = dsp.TrapezoidalSVF(
+                macp=server.new_client(), n_channels=n_voices)
 
         # Connect MIDI stream -> voice tracker
         wiring.connect(m, wiring.flipped(self.i_midi), voice_tracker.i)
 
-        # analog ins
-        m.submodules.cv_in = cv_in = dsp.Split(
-                n_channels=4, source=wiring.flipped(self.i))
-        cv_in.wire_ready(m, [2, 3])
-
-        for n in range(n_voices):
+        # Connect audio in -> NCO bank. Only audio in #0 is used, so the
+        # input stream is consumed directly (no channel splitter needed).
+        cv_in = wiring.flipped(self.i)
+        dsp.connect_remap(m, cv_in, nco_bank.i, lambda o, i : [
+            # For fun, phase mod on audio in #0
+            i.payload.phase.eq(o.payload[0]),
+        ] + [
+            i.payload.freq_inc[n].eq(voice_tracker.o[n].freq_inc)
+            for n in range(n_voices)
+        ])
+
+        # Local copies of the SoC tweakables, so the (high fanout) voice
+        # and output stages are fed from a register inside the synth
+        # rather than directly from the CSR peripheral.
+        reso_reg = Signal.like(self.reso)
+        drive_reg = Signal.like(self.drive)
+        m.d.sync += [
+            reso_reg.eq(self.reso),
+            drive_reg.eq(self.drive),
+        ]
 
-            m.d.comb += self.voice_states[n].eq(voice_tracker.o[n])
+        # Simple counting smoothers for the filter cutoffs, stepped
+        # once per audio sample.
+        m.submodules.followers = followers = dsp.CountingFollowerBank(
+                n=n_voices, bits=8)
+        m.d.comb += [
+            followers.i.valid.eq(cv_in.valid & cv_in.ready),
+            followers.o.ready.eq(1),
+        ]
+        m.d.comb += [
+            followers.i.payload[n].eq(voice_tracker.o[n].velocity_mod)
+            for n in range(n_voices)
+        ]
 
-            # Connect audio in -> NCO.i
-            dsp.connect_remap(m, cv_in.o[0], ncos[n].i, lambda o, i : [
-                # For fun, phase mod on audio in #0
-                i.payload.phase   .eq(o.payload),
-                i.payload.freq_inc.eq(voice_tracker.o[n].freq_inc)
-            ])
+        m.d.comb += self.voice_states_rd_data.eq(
+            Array(voice_tracker.o)[self.voice_states_rd_idx])
 
-            # Simple counting smoother for the filter cutoff.
-            follower = dsp.CountingFollower(bits=8)
-            m.submodules += follower
-            m.d.comb += [
-                follower.i.valid.eq(cv_in.o[0].valid), # hack to clock at audio rate
-                follower.i.payload.eq(voice_tracker.o[n].velocity_mod),
-                follower.o.ready.eq(1)
+        # Connect voice.vel and NCO.o -> SVF.
+        dsp.connect_remap(m, nco_bank.o, svf.i, lambda o, i : [
+            stmt for n in range(n_voices) for stmt in [
+                i.payload.x[n]                 .eq(o.payload[n] >> 1),
+                i.payload.resonance[n].raw()   .eq(reso_reg),
+                i.payload.cutoff[n]            .eq(followers.o.payload[n] << 5)
             ]
+        ])
 
-            # Connect voice.vel and NCO.o -> SVF.
-            dsp.connect_remap(m, ncos[n].o, svfs[n].i, lambda o, i : [
-                i.payload.x                    .eq(o.payload >> 1),
-                i.payload.resonance.raw()      .eq(self.reso),
-                i.payload.cutoff               .eq(follower.o.payload << 5)
-            ])
-
-            # Connect SVF LPF -> merge channel
-            dsp.connect_remap(m, svfs[n].o, merge.i[n], lambda o, i : [
-                i.payload.eq(o.payload.lp),
-            ])
+        # Idle voices (filter envelope fully decayed, so zero cutoff) do not
+        # contribute to the LPF output at all. Hold their oscillator input
+        # at zero so the shared SVF datapath does not toggle for them.
+        for n in range(n_voices):
+            with m.If(followers.o.payload[n] == 0):
+                m.d.comb += svf.i.payload.x[n].eq(0)
 
         # Voice mixdown to stereo. Alternate left/right
         o_channels = 2
         coefficients = [[0.75*o_channels/n_voices, 0.0                ],
                         [0.0,                      0.75*o_channels/n_voices]] * (n_voices // 2)
-        m.submodules.matrix_mix = matrix_mix = dsp.MatrixMix(
+        # Static coefficients, so use shift-and-add constant mixing.
+        m.submodules.matrix_mix = matrix_mix = dsp.MatrixMixConst(
             i_channels=n_voices, o_channels=o_channels,
             coefficients=coefficients)
-        wiring.connect(m, merge.o, matrix_mix.i),
+        # Connect SVF LPFs -> voice mixdown
+        dsp.connect_remap(m, svf.o, matrix_mix.i, lambda o, i : [
+            i.payload[n].eq(o.payload.lp[n]) for n in range(n_voices)
+        ])
 
         # Output diffuser
 
-        m.submodules.diffuser = diffuser = Diffuser()
-        self.diffuser = diffuser
+        m.submodules.diffuser = diffuser = self.diffuser
+        wiring.connect(m, diffuser.bus, wiring.flipped(self.bus))
 
         # Stereo HPF to remove DC from any voices in 'zero cutoff'
         # Route to audio output channels 2 & 3
 
-        output_hpfs = [dsp.SVF() for _ in range(o_channels)]
-        dsp.named_submodules(m.submodules, output_hpfs, override_name="output_hpf")
-
-        m.submodules.hpf_split2 = hpf_split2 = dsp.Split(n_channels=2, source=matrix_mix.o)
-        m.submodules.hpf_merge4 = hpf_merge4 = dsp.Merge(n_channels=4, sink=diffuser.i)
-        hpf_merge4.wire_valid(m, [0, 1])
+        m.submodules.output_hpf = output_hpf = dsp.SVF(
+                macp=server.new_client(), n_channels=o_channels)
 
-        for lr in [0, 1]:
-            dsp.connect_remap(m, hpf_split2.o[lr], output_hpfs[lr].i, lambda o, i : [
-                i.payload.x                     .eq(o.payload),
-                i.payload.cutoff.raw()          .eq(200),
-                i.payload.resonance.raw()       .eq(20000),
-            ])
+        dsp.connect_remap(m, matrix_mix.o, output_hpf.i, lambda o, i : [
+            stmt for lr in [0, 1] for stmt in [
+                i.payload.x[lr]                 .eq(o.payload[lr]),
+                i.payload.cutoff[lr].raw()      .eq(200),
+                i.payload.resonance[lr].raw()   .eq(20000),
+            ]
+        ])
 
-            dsp.connect_remap(m, output_hpfs[lr].o, hpf_merge4.i[2+lr], lambda o, i : [
-                i.payload.eq(o.payload.hp << 2)
-            ])
+        # Diffuser channels 0, 1 are unused (zero).
+        dsp.connect_remap(m, output_hpf.o, diffuser.i, lambda o, i : [
+            i.payload[2+lr].eq(o.payload.hp[lr] << 2) for lr in [0, 1]
+        ])
 
         # Implement stereo distortion effect after diffuser.
 
-        m.submodules.diffuser_split4 = diffuser_split4 = dsp.Split(
-                n_channels=4, source=diffuser.o)
-        diffuser_split4.wire_ready(m, [0, 1])
-
-        m.submodules.cv_gain_split2 = cv_gain_split2 = dsp.Split(
-                n_channels=2, replicate=True, source=cv_in.o[1])
-
         def scaled_tanh(x):
             return math.tanh(3.0*x)
 
-        outs = []
-        for lr in [0, 1]:
-            vca = dsp.GainVCA()
-            waveshaper = dsp.WaveShaper(lut_function=scaled_tanh)
-            vca_merge2 = dsp.Merge(n_channels=2)
-            setattr(m.submodules, f"out_gainvca_{lr}", vca)
-            setattr(m.submodules, f"out_waveshaper_{lr}", waveshaper)
-            setattr(m.submodules, f"out_vca_merge2_{lr}", vca_merge2)
-
-            wiring.connect(m, diffuser_split4.o[2+lr], vca_merge2.i[0])
-            wiring.connect(m, cv_gain_split2.o[lr],    vca_merge2.i[1])
-
-            dsp.connect_remap(m, vca_merge2.o, vca.i, lambda o, i : [
-                i.payload.x   .eq(o.payload[0]),
-                #i.payload.gain.eq(o.payload[1] << 2)
-                i.payload.gain.eq(self.drive << 2)
-            ])
-
-            wiring.connect(m, vca.o, waveshaper.i)
-            outs.append(waveshaper.o)
+        # Output waveshaper reads from a LUT which has the drive
+        # amount already applied (no multiply before the LUT).
+        m.submodules.drive_lut = drive_lut = DriveShaperLUT(
+                lut_function=scaled_tanh,
+                drive_init=self.drive.init,
+                vca_macp=server.new_client(),
+                waveshaper_macp=server.new_client())
+        m.d.comb += drive_lut.drive.eq(drive_reg)
+
+        # Left and right are looked up one after the other by the same
+        # waveshaper, so only a single LUT read port is needed.
+        m.submodules.out_waveshaper = out_waveshaper = dsp.WaveShaper(
+                lut_mem=drive_lut.mem, macp=server.new_client(), n_channels=2)
+
+        # Diffuser channels 0, 1 are unused (zero).
+        dsp.connect_remap(m, diffuser.o, out_waveshaper.i, lambda o, i : [
+            i.payload[lr].eq(o.payload[2+lr]) for lr in [0, 1]
+        ])
 
         # Final outputs on channel 2, 3
-        m.submodules.merge4 = merge4 = dsp.Merge(
-                n_channels=4, sink=wiring.flipped(self.o))
-        merge4.wire_valid(m, [0, 1])
-        wiring.connect(m, outs[0], merge4.i[2])
-        wiring.connect(m, outs[1], merge4.i[3])
+        dsp.connect_remap(m, out_waveshaper.o, wiring.flipped(self.o), lambda o, i : [
+            i.payload[2+lr].eq(o.payload[lr]) for lr in [0, 1]
+        ])
 
         return m
 
@@ -258,14 +390,16 @@ class SynthPeripheral(wiring.Component):
     class MidiRead(csr.Register, access="r"):
         msg: csr.Field(csr.action.R, unsigned(32))
 
+    VOICES_CSR_BASE = 0x8
+
     def __init__(self, synth=None):
         self.synth = synth
         regs = csr.Builder(addr_width=7, data_width=8)
-        voices_csr_end = 0x8+PolySynth.N_VOICES*4
+        voices_csr_end = self.VOICES_CSR_BASE+PolySynth.N_VOICES*4
         self._drive         = regs.add("drive",         self.Drive(),        offset=0x0)
         self._reso          = regs.add("reso",          self.Reso(),         offset=0x4)
         self._voices        = [regs.add(f"voices{i}",   self.Voice(),
-                               offset=0x8+i*4) for i in range(PolySynth.N_VOICES)]
+                               offset=self.VOICES_CSR_BASE+i*4) for i in range(PolySynth.N_VOICES)]
         self._matrix        = regs.add("matrix",        self.Matrix(),       offset=voices_csr_end + 0x0)
         self._matrix_busy   = regs.add("matrix_busy",   self.MatrixBusy(),   offset=voices_csr_end + 0x4)
         self._midi_write    = regs.add("midi_write",    self.MidiWrite(),    offset=voices_csr_end + 0x8)
@@ -288,31 +422,66 @@ class SynthPeripheral(wiring.Component):
         with m.If(self._reso.f.value.w_stb):
             m.d.sync += self.synth.reso.eq(self._reso.f.value.w_data)
 
-        # voice tracking
+        # voice tracking. The CSR multiplexer samples a register's r_data
+        # in the same cycle its (first) address is on the bus, so one voice
+        # at a time is selected using the bus address. This relies on the
+        # voice registers sitting at consecutive, 4-byte aligned offsets.
+        assert self.VOICES_CSR_BASE % 4 == 0
+        for i, voice in enumerate(self._voices):
+            info = self.bus.memory_map.find_resource(voice)
+            assert info.start == self.VOICES_CSR_BASE + i*4
+            assert info.end - info.start <= 4
+        m.d.comb += self.synth.voice_states_rd_idx.eq(
+            (self.bus.addr >> 2) - (self.VOICES_CSR_BASE >> 2))
         for i, voice in enumerate(self._voices):
             m.d.comb += [
-                voice.f.note.r_data  .eq(self.synth.voice_states[i].note),
-                voice.f.cutoff.r_data.eq(self.synth.voice_states[i].velocity_mod)
+                voice.f.note.r_data  .eq(self.synth.voice_states_rd_data.note),
+                voice.f.cutoff.r_data.eq(self.synth.voice_states_rd_data.velocity_mod)
             ]
 
         # matrix coefficient update logic
         matrix_busy = Signal()
         m.d.comb += self._matrix_busy.f.busy.r_data.eq(matrix_busy)
-        with m.If(self._matrix.element.w_stb & ~matrix_busy):
-            m.d.sync += [
-                matrix_busy.eq(1),
-                self.synth.diffuser.matrix.c.payload.o_x         .eq(self._matrix.f.o_x.w_data),
-                self.synth.diffuser.matrix.c.payload.i_y         .eq(self._matrix.f.i_y.w_data),
-                self.synth.diffuser.matrix.c.payload.v.as_value().eq(self._matrix.f.value.w_data),
-                self.synth.diffuser.matrix.c.valid.eq(1),
-            ]
-        with m.If(matrix_busy & self.synth.diffuser.matrix.c.ready):
-            # coefficient has been written
-            m.d.sync += [
-                matrix_busy.eq(0),
-                self.synth.diffuser.matrix.c.valid.eq(0),
-            ]
-
+        # With a fixed diffuser matrix (no `c` stream), coefficient writes
+        # are ignored and we are never busy.
+        if isinstance(self.synth.diffuser.matrix, dsp.MatrixMix):
+            # The CSR carries a 24-bit coefficient (same fractional bits as the
+            # 18-bit matrix coefficients). Saturate instead of wrapping anything
+            # that does not fit in the (narrower) matrix coefficient type.
+            ctype = self.synth.diffuser.matrix.ctype
+            value = self._matrix.f.value.w_data
+            c_max = ctype.max().as_value()
+            c_min = ctype.min().as_value()
+            value_sat = Signal(signed(ctype.as_shape().width))
+            with m.If(value > c_max):
+                m.d.comb += value_sat.eq(c_max)
+            with m.Elif(value < c_min):
+                m.d.comb += value_sat.eq(c_min)
+            with m.Else():
+                m.d.comb += value_sat.eq(value)
+            with m.If(self._matrix.element.w_stb & ~matrix_busy):
+                m.d.sync += [
+                    matrix_busy.eq(1),
+                    self.synth.diffuser.matrix.c.payload.o_x         .eq(self._matrix.f.o_x.w_data),
+                    self.synth.diffuser.matrix.c.payload.i_y         .eq(self._matrix.f.i_y.w_data),
+                    self.synth.diffuser.matrix.c.payload.v.as_value().eq(value_sat),
+                    self.synth.diffuser.matrix.c.valid.eq(1),
+                ]
+            # Registered copy of the coefficient write handshake, so the path
+            # from the matrix FSM (c.ready) back into this logic is not
+            # combinational. It only fires once per request, so neither a stale
+            # c.ready nor the extra cycle c.valid stays high can clear the
+            # busy flag of a following request.
+            matrix_written = Signal()
+            m.d.sync += matrix_written.eq(matrix_busy & ~matrix_written &
+                                          self.synth.diffuser.matrix.c.valid &
+                                          self.synth.diffuser.matrix.c.ready)
+            with m.If(matrix_busy & matrix_written):
+                # coefficient has been written
+                m.d.sync += [
+                    matrix_busy.eq(0),
+                    self.synth.diffuser.matrix.c.valid.eq(0),
+                ]
 
         # MIDI injection and arbiter between SoC MIDI and HW MIDI -> synth MIDI.
         m.submodules.soc_midi_fifo = soc_midi_fifo = SyncFIFOBuffered(
@@ -321,9 +490,13 @@ class SynthPeripheral(wiring.Component):
             soc_midi_fifo.w_data.eq(self._midi_write.f.msg.w_data),
             soc_midi_fifo.w_en.eq(self._midi_write.element.w_stb),
         ]
-        wiring.connect(m, wiring.flipped(self.i_midi), self.synth.i_midi)
+        # SoC messages take priority. TRS MIDI is stalled (not dropped)
+        # while they are forwarded, so a TRS message is only acknowledged
+        # (and copied to the read FIFO below) once the synth accepted it.
         with m.If(soc_midi_fifo.r_stream.valid):
             wiring.connect(m, soc_midi_fifo.r_stream, self.synth.i_midi)
+        with m.Else():
+            wiring.connect(m, wiring.flipped(self.i_midi), self.synth.i_midi)
 
         # Pipe TRS MIDI -> SoC read FIFO so SoC can inspect external
         # MIDI traffic
@@ -331,7 +504,8 @@ class SynthPeripheral(wiring.Component):
             width=24, depth=8)
         m.d.comb += [
             read_midi_fifo.w_data.eq(self.i_midi.payload),
-            read_midi_fifo.w_en.eq(self.i_midi.valid & self.i_midi.ready),
+            read_midi_fifo.w_en.eq(self.i_midi.valid & self.i_midi.ready &
+                                   read_midi_fifo.w_rdy),
             read_midi_fifo.r_en.eq(self._midi_read.element.r_stb),
         ]
 
@@ -365,8 +539,12 @@ class PolySoc(TiliquaSoc):
             video_rotate_90=self.video_rotate_90)
         self.csr_decoder.add(self.vector_periph.bus, addr=self.vector_periph_base, name="vector_periph")
 
+        # synth, diffuser delay lines are backed by PSRAM
+        self.polysynth = PolySynth()
+        self.psram_periph.add_master(self.polysynth.bus)
+
         # synth controls
-        self.synth_periph = SynthPeripheral()
+        self.synth_periph = SynthPeripheral(synth=self.polysynth)
         self.csr_decoder.add(self.synth_periph.bus, addr=self.synth_periph_base, name="synth_periph")
 
         self.add_rust_constant(
@@ -381,8 +559,7 @@ class PolySoc(TiliquaSoc):
 
         m.submodules.vector_periph = self.vector_periph
 
-        m.submodules.polysynth = polysynth = PolySynth()
-        self.synth_periph.synth = polysynth
+        m.submodules.polysynth = polysynth = self.polysynth
 
         m.submodules.synth_periph = self.synth_periph
 
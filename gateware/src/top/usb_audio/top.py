@@ -46,7 +46,7 @@ from tiliqua.eurorack_pmod                    import EurorackPmod
 from tiliqua.tiliqua_platform                 import RebootProvider
 from vendor.ila                               import AsyncSerialILA
 
-from util                   import EdgeToPulse, connect_fifo_to_stream, connect_stream_to_fifo
+from util                   import AudioTickGen, connect_fifo_to_stream, connect_stream_to_fifo
 from usb_stream_to_channels import USBStreamToChannels
 from channels_to_usb_stream import ChannelsToUSBStream
 from audio_to_channels      import AudioToChannels
@@ -58,9 +58,20 @@ class USB2AudioInterface(Elaboratable):
     MAX_PACKET_SIZE = int(224 // 8 * NR_CHANNELS)
     MAX_PACKET_SIZE_MIDI = 64
 
+    # Emitted descriptors, shared by every elaboration with the same tuning
+    # parameters (keyed on NR_CHANNELS, MAX_PACKET_SIZE, MAX_PACKET_SIZE_MIDI).
+    _descriptors_cached = {}
+
     def __init__(self, **kwargs):
         super().__init__()
 
+    def descriptors(self):
+        """ Returns our descriptors, emitting them only once per parameter set. """
+        key = (self.NR_CHANNELS, self.MAX_PACKET_SIZE, self.MAX_PACKET_SIZE_MIDI)
+        if key not in self._descriptors_cached:
+            self._descriptors_cached[key] = self.create_descriptors()
+        return self._descriptors_cached[key]
+
     def create_descriptors(self):
         """ Creates the descriptors that describe our audio topology. """
 
@@ -331,7 +342,7 @@ class USB2AudioInterface(Elaboratable):
         m.submodules.usb = usb = USBDevice(bus=ulpi)
 
         # Add our standard control endpoint to the device.
-        descriptors = self.create_descriptors()
+        descriptors = self.descriptors()
         control_ep = usb.add_control_endpoint()
         control_ep.add_standard_request_handlers(descriptors, blacklist=[
             lambda setup:   (setup.type    == USBRequestType.STANDARD)
@@ -379,17 +390,18 @@ class USB2AudioInterface(Elaboratable):
         audio_in_frame_bytes = Signal(range(self.MAX_PACKET_SIZE), reset=24 * self.NR_CHANNELS)
         audio_in_frame_bytes_counting = Signal()
 
-        with m.If(ep1_out.stream.valid & ep1_out.stream.ready):
-            with m.If(audio_in_frame_bytes_counting):
-                m.d.usb += audio_in_frame_bytes.eq(audio_in_frame_bytes + 1)
-
-            with m.If(ep1_out.stream.first):
-                m.d.usb += [
-                    audio_in_frame_bytes.eq(1),
-                    audio_in_frame_bytes_counting.eq(1),
-                ]
-            with m.Elif(ep1_out.stream.last):
-                m.d.usb += audio_in_frame_bytes_counting.eq(0)
+        ep1_out_xfer  = ep1_out.stream.valid & ep1_out.stream.ready
+        ep1_out_first = ep1_out_xfer & ep1_out.stream.first
+        m.d.usb += [
+            audio_in_frame_bytes.eq(
+                Mux(ep1_out_first, 1,
+                    Mux(ep1_out_xfer & audio_in_frame_bytes_counting,
+                        audio_in_frame_bytes + 1, audio_in_frame_bytes))),
+            audio_in_frame_bytes_counting.eq(
+                Mux(ep1_out_first, 1,
+                    Mux(ep1_out_xfer & ep1_out.stream.last,
+                        0, audio_in_frame_bytes_counting))),
+        ]
 
         # Connect our device as a high speed device
         m.d.comb += [
@@ -400,25 +412,27 @@ class USB2AudioInterface(Elaboratable):
         ]
 
         # feedback endpoint
-        feedbackValue      = Signal(32, reset=0x60000)
-        bitPos             = Signal(5)
+        feedbackValue      = Signal(32)
+
+        # feedbackValue is a smoothed copy of the raw sample rate measurement
+        # (one-pole lowpass, time constant 2**FEEDBACK_SMOOTH_SHIFT measurements),
+        # so the host sees a stable rate instead of the bang-bang count. The
+        # accumulator keeps FEEDBACK_SMOOTH_SHIFT extra fractional bits.
+        FEEDBACK_SMOOTH_SHIFT = 3
+        feedback_acc       = Signal(32+FEEDBACK_SMOOTH_SHIFT,
+                                    reset=0x60000 << FEEDBACK_SMOOTH_SHIFT)
+        m.d.comb += feedbackValue.eq(feedback_acc >> FEEDBACK_SMOOTH_SHIFT)
 
         # this tracks the number of audio frames since the last USB frame
         # 12.288MHz / 8kHz = 1536, so we need at least 11 bits = 2048
         # we need to capture 32 micro frames to get to the precision
         # required by the USB standard, so and that is 0xc000, so we
-        # need 16 bits here
-        audio_clock_counter = Signal(24)
+        # need 16 bits here (0xc800 worst case with the 12.5MHz fallback PLL)
+        audio_clock_counter = Signal(16)
         sof_counter         = Signal(5)
 
-        audio_clock_usb = Signal()
-        m.submodules.audio_clock_usb_sync = FFSynchronizer(ClockSignal("audio"), audio_clock_usb, o_domain="usb")
-        m.submodules.audio_clock_usb_pulse = audio_clock_usb_pulse = DomainRenamer("usb")(EdgeToPulse())
-        audio_clock_tick = Signal()
-        m.d.usb += [
-            audio_clock_usb_pulse.edge_in.eq(audio_clock_usb),
-            audio_clock_tick.eq(audio_clock_usb_pulse.pulse_out),
-        ]
+        m.submodules.audio_tick_gen = audio_tick_gen = DomainRenamer("usb")(AudioTickGen())
+        audio_clock_tick = audio_tick_gen.tick
 
         with m.If(audio_clock_tick):
             m.d.usb += audio_clock_counter.eq(audio_clock_counter + 1)
@@ -436,14 +450,14 @@ class USB2AudioInterface(Elaboratable):
             with m.If(sof_counter == 0):
                 m.d.usb += [
                     # FIFO feedback?
-                    feedbackValue.eq(audio_clock_counter << 3),
-                    audio_clock_counter.eq(0),
+                    feedback_acc.eq(feedback_acc + (audio_clock_counter << 3) -
+                                    (feedback_acc >> FEEDBACK_SMOOTH_SHIFT)),
+                    # restart counting, without dropping a tick on this cycle.
+                    audio_clock_counter.eq(audio_clock_tick),
                 ]
 
-        m.d.comb += [
-            bitPos.eq(ep1_in.address << 3),
-            ep1_in.value.eq(0xff & (feedbackValue >> bitPos)),
-        ]
+        # feedback is 4 bytes per frame, select the byte being sent
+        m.d.comb += ep1_in.value.eq(feedbackValue.word_select(ep1_in.address[0:2], 8))
 
         m.submodules.usb_to_channel_stream = usb_to_channel_stream = \
             DomainRenamer("usb")(USBStreamToChannels(self.NR_CHANNELS))
@@ -467,13 +481,26 @@ class USB2AudioInterface(Elaboratable):
 
             return audio_in_active
 
-            usb_audio_in_active  = detect_active_audio_in(m, "usb", usb, ep2_in)
-
         usb_audio_in_active = detect_active_audio_in(m, "usb", usb, ep2_in)
 
+        # Buffer ~1.8ms of audio after the OUT endpoint, so hosts that deliver
+        # microframes in bursts, or short stalls in usb_to_channel_stream, do
+        # not back-pressure the endpoint mid-packet. 1024 entries of 10 bits
+        # (byte + first/last) is 1023 words of storage (+1 output register),
+        # which fits in a single DP16KD (1024x18 mode). At 4ch * 3 bytes per
+        # frame that is 85 frames, i.e. up to ~1.8ms of added EP1 OUT latency
+        # when the FIFO is full (normally it runs close to empty).
+        # (The IN direction is already buffered inside ChannelsToUSBStream).
+        EP1_OUT_FIFO_DEPTH = 1024
+        m.submodules.ep1_out_fifo = ep1_out_fifo = DomainRenamer("usb")(
+            SyncFIFOBuffered(width=8+2, depth=EP1_OUT_FIFO_DEPTH))
+        m.d.comb += connect_stream_to_fifo(ep1_out.stream, ep1_out_fifo,
+                                           firstBit=8, lastBit=9)
+        m.d.comb += connect_fifo_to_stream(ep1_out_fifo, usb_to_channel_stream.usb_stream_in,
+                                           firstBit=8, lastBit=9)
+
         m.d.comb += [
             # Wire USB <-> stream synchronizers
-            usb_to_channel_stream.usb_stream_in.stream_eq(ep1_out.stream),
             ep2_in.stream.stream_eq(channels_to_usb_stream.usb_stream_out),
 
             channels_to_usb_stream.no_channels_in.eq(self.NR_CHANNELS),
@@ -493,85 +520,81 @@ class USB2AudioInterface(Elaboratable):
                 to_usb_stream=channels_to_usb_stream.channel_stream_in,
                 from_usb_stream=usb_to_channel_stream.channel_stream_out)
 
-        jack_period = Signal(32)
+        # Counts down to the next touch MIDI update.
+        JACK_PERIOD = int(60000000 / 40)
+        jack_period = Signal(range(JACK_PERIOD+1), reset=JACK_PERIOD)
         jack_usb = Signal(8)
-        m.submodules.jack_sync = FFSynchronizer(pmod0.jack, jack_usb, o_domain="usb")
+        m.submodules.jack_sync = FFSynchronizer(pmod0.jack, jack_usb, o_domain="usb",
+                                                reset=0, stages=3)
 
         N_TOUCH_CHANNELS = 8
-        touch_usb = []
-        for n in range(N_TOUCH_CHANNELS):
-            touch_usb.append(Signal(8))
-            setattr(m.submodules, f"touch_usb_synchronizer{n}",
-                    FFSynchronizer(pmod0.touch[n], touch_usb[n], o_domain="usb"))
+        # All touch channels cross into the USB domain through one packed
+        # synchronizer. Each byte is independent, so no coherency is implied.
+        touch_usb = Signal(8*N_TOUCH_CHANNELS)
+        m.submodules.touch_sync = FFSynchronizer(
+                Cat(*[pmod0.touch[n] for n in range(N_TOUCH_CHANNELS)]),
+                touch_usb, o_domain="usb", reset=0, stages=3)
 
         touch_ch = Signal(3)
+        # Byte index within the current 4-byte USB-MIDI CC event.
+        touch_b = Signal(2)
+        # The event being sent, latched once per channel and sent byte-wise.
+        touch_msg = Signal(32)
+
+        def touch_cc_msg(ch):
+            # USB-MIDI CC event {0x0B, 0xB0, ch, value} for touch channel `ch`.
+            # Round to 0-127 as MIDI CC requires, saturating so 0xFF does not
+            # round up to 0x80.
+            value = touch_usb.word_select(ch, 8)
+            value = Mux(value == 0xFF, 0x7F, (value + 1) >> 1)
+            return Cat(Const(0x0B, 8), Const(0xB0, 8), ch, Const(0, 8-len(ch)), value[:8])
 
         with m.FSM(domain="usb") as fsm:
             with m.State("WAIT"):
                 # 100Hz // TODO make this delta
-                with m.If(jack_period == int(60000000 / 40)):
+                with m.If(jack_period == 0):
                     m.d.usb += [
-                        jack_period.eq(0),
-                        touch_ch.eq(0)
+                        jack_period.eq(JACK_PERIOD),
+                        touch_ch.eq(0),
+                        touch_b.eq(0),
+                        touch_msg.eq(touch_cc_msg(Const(0, 3))),
                     ]
-                    m.next = "B0"
+                    m.next = "SEND"
                 with m.Else():
-                    m.d.usb += jack_period.eq(jack_period + 1)
-            with m.State("B0"):
-                m.d.comb += [
-                    usb_ep3_in.stream.payload.eq(0x0B),
-                    usb_ep3_in.stream.first.eq(touch_ch == 0),
-                    usb_ep3_in.stream.valid.eq(1),
-                ]
-                with m.If(usb_ep3_in.stream.ready):
-                    m.next = "B1"
-            with m.State("B1"):
+                    m.d.usb += jack_period.eq(jack_period - 1)
+            with m.State("SEND"):
                 m.d.comb += [
-                    usb_ep3_in.stream.payload.eq(0xB0),
                     usb_ep3_in.stream.valid.eq(1),
+                    usb_ep3_in.stream.payload.eq(touch_msg.word_select(touch_b, 8)),
+                    usb_ep3_in.stream.first.eq((touch_b == 0) & (touch_ch == 0)),
+                    usb_ep3_in.stream.last.eq(
+                        (touch_b == 3) & (touch_ch == (N_TOUCH_CHANNELS - 1))),
                 ]
                 with m.If(usb_ep3_in.stream.ready):
-                    m.next = "B2"
-            with m.State("B2"):
-                m.d.comb += [
-                    usb_ep3_in.stream.payload.eq(touch_ch),
-                    usb_ep3_in.stream.valid.eq(1),
-                ]
-                with m.If(usb_ep3_in.stream.ready):
-                    m.next = "B3"
-            with m.State("B3"):
-
-                m.d.comb += [
-                    usb_ep3_in.stream.last.eq(touch_ch == (N_TOUCH_CHANNELS - 1)),
-                    usb_ep3_in.stream.valid.eq(1),
-                ]
-
-                # Infer mux of active channel to payload
-                with m.Switch(touch_ch):
-                    for n in range(N_TOUCH_CHANNELS):
-                        with m.Case(n):
-                            # Shift to get 0-127 as MIDI CC requires
-                            m.d.comb += usb_ep3_in.stream.payload.eq(touch_usb[n] >> 1),
-
-                with m.If(usb_ep3_in.stream.ready):
-                    with m.If(touch_ch == (N_TOUCH_CHANNELS - 1)):
-                        m.next = "WAIT"
-                    with m.Else():
-                        m.d.usb += touch_ch.eq(touch_ch + 1)
-                        m.next = "B0"
+                    m.d.usb += touch_b.eq(touch_b + 1)
+                    with m.If(touch_b == 3):
+                        touch_ch_next = (touch_ch + 1)[:3]
+                        m.d.usb += [
+                            touch_ch.eq(touch_ch_next),
+                            touch_msg.eq(touch_cc_msg(touch_ch_next)),
+                        ]
+                        with m.If(touch_ch == (N_TOUCH_CHANNELS - 1)):
+                            m.next = "WAIT"
 
         if platform.ila:
 
             test_signal = Signal(16, reset=0xFEED)
-            pmod_sample_o0 = Signal(16)
+            # Only the top 12 bits of the sample are of diagnostic interest.
+            pmod_sample_o0 = Signal(12)
 
-            m.d.comb += pmod_sample_o0.eq(pmod0.sample_o[0])
+            m.d.comb += pmod_sample_o0.eq(pmod0.sample_o[0].raw()[4:])
 
             ila_signals = [
                 test_signal,
                 pmod_sample_o0,
                 pmod0.fs_strobe,
                 m.submodules.audio_to_channels.dac_fifo_level,
+                ep1_out_fifo.level,
 
                 # channel stream
                 #usb_to_channel_stream.channel_stream_out.channel_nr,
@@ -593,8 +616,8 @@ class USB2AudioInterface(Elaboratable):
 
                 usb.sof_detected,
                 sof_counter,
-                feedbackValue,
-                bitPos,
+                # smoothed 16.16 feedback value, upper bits are constant
+                feedbackValue[3:19],
             ]
 
             self.ila = AsyncSerialILA(signals=ila_signals,
@@ -681,34 +704,29 @@ class UAC2RequestHandlers(USBRequestHandler):
                     with m.Else():
                         m.d.comb += interface.handshakes_out.stall.eq(1)
 
-                    # ... trigger it to respond when data's requested...
-                    with m.If(interface.data_requested):
-                        m.d.comb += transmitter.start.eq(1)
-
-                    # ... and ACK our status stage.
-                    with m.If(interface.status_requested):
-                        m.d.comb += interface.handshakes_out.ack.eq(1)
-
                 with m.Case(AudioClassSpecificRequestCodes.CUR):
                     m.d.comb += interface.claim.eq(1)
                     m.d.comb += transmitter.stream.attach(self.interface.tx)
                     with m.If(request_clock_freq & (setup.length == 4)):
                         m.d.comb += [
-                            Cat(transmitter.data[0:4]).eq(Const(48000, 32)),
-                            transmitter.max_length.eq(4)
+                            transmitter.data[i].eq(b)
+                            for i, b in enumerate((48000).to_bytes(4, 'little'))
                         ]
+                        m.d.comb += transmitter.max_length.eq(4)
                     with m.Else():
                         m.d.comb += interface.handshakes_out.stall.eq(1)
 
-                    # ... trigger it to respond when data's requested...
-                    with m.If(interface.data_requested):
-                        m.d.comb += transmitter.start.eq(1)
+            # Both claimed requests respond from the transmitter...
+            with m.If(interface.claim):
+                # ... trigger it to respond when data's requested...
+                with m.If(interface.data_requested):
+                    m.d.comb += transmitter.start.eq(1)
 
-                    # ... and ACK our status stage.
-                    with m.If(interface.status_requested):
-                        m.d.comb += interface.handshakes_out.ack.eq(1)
+                # ... and ACK our status stage.
+                with m.If(interface.status_requested):
+                    m.d.comb += interface.handshakes_out.ack.eq(1)
 
-                return m
+        return m
 
 if __name__ == "__main__":
     top_level_cli(USB2AudioInterface, video_core=False, ila_supported=True)
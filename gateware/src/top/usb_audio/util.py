@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: BSD--3-Clause
 
 from amaranth             import *
+from amaranth.lib.cdc     import FFSynchronizer
 
 # some things lifted from `amlib`, given we don't need anyting else from there.
 
@@ -29,6 +30,28 @@ class EdgeToPulse(Elaboratable):
 
         return m
 
+class AudioTickGen(Elaboratable):
+    """
+        synchronizes the "audio" clock into this module's domain and
+        emits a single clock pulse on tick for each audio clock cycle.
+        instantiate once and share tick between all consumers.
+    """
+    def __init__(self):
+        self.tick             = Signal()
+
+    def elaborate(self, platform) -> Module:
+        m = Module()
+
+        audio_clock = Signal()
+        m.submodules.audio_clock_sync = FFSynchronizer(ClockSignal("audio"), audio_clock)
+        m.submodules.audio_clock_pulse = audio_clock_pulse = EdgeToPulse()
+        m.d.sync += [
+            audio_clock_pulse.edge_in.eq(audio_clock),
+            self.tick.eq(audio_clock_pulse.pulse_out),
+        ]
+
+        return m
+
 def connect_fifo_to_stream(fifo, stream, firstBit: int=None, lastBit: int=None) -> None:
     """Connects the output of the FIFO to the of the stream. Data flows from the fifo the stream.
        It is assumed the payload occupies the lowest significant bits
@@ -86,7 +86,11 @@ class USB2HostTest(Elaboratable):
         wiring.connect(m, midi_decode.o, self.midi_cv.i_midi)
 
         # XXX: this demo enables VBUS output
-        m.d.comb += platform.request("usb_vbus_en").o.eq(1)
+        # Only once the sync domain is running, and drop it again just
+        # before we reboot (alongside the CODEC mute).
+        vbus_en = Signal()
+        m.d.sync += vbus_en.eq(~reboot.mute)
+        m.d.comb += platform.request("usb_vbus_en").o.eq(vbus_en)
 
         if platform.ila:
             test_signal = Signal(16, reset=0xFEED)
@@ -132,11 +136,12 @@ def argparse_callback(parser):
 
 def argparse_fragment(args):
     # Additional arguments to be provided to CoreTop
-    if args.midi_device not in MIDI_DEVICES:
+    device = MIDI_DEVICES.get(args.midi_device)
+    if device is None:
         print(f"provided '--midi-device {args.midi_device}' is not one of {list(MIDI_DEVICES)}")
         sys.exit(-1)
 
-    config_id, endp_id = MIDI_DEVICES[args.midi_device]
+    config_id, endp_id = device
     return {
         "usb_device_config_id": config_id,
         "usb_midi_bulk_endp_id": endp_id,
@@ -0,0 +1,179 @@
+# Copyright (c) 2024 Seb Holzapfel <me@sebholzapfel.com>
+#
+# SPDX-License-Identifier: CERN-OHL-S-2.0
+
+import unittest
+
+from amaranth              import *
+from amaranth.sim          import *
+from tiliqua               import test_util
+
+from amaranth_soc          import csr
+from amaranth_soc.csr      import wishbone
+
+from top.macro_osc.top     import AudioFIFOPeripheral
+
+class MacroOscTests(unittest.TestCase):
+
+    # DMA reads from word addresses at or above this end in a bus error.
+    ERR_ADR = 0x1000
+    # Cycles before each DMA read is acknowledged.
+    DMA_LATENCY = 20
+
+    def audio_fifo_dut(self, **kwargs):
+        m = Module()
+        # 'audio' domain (FIFO read side) is never clocked, so nothing is
+        # drained from the FIFO during these tests.
+        m.domains.audio = ClockDomain()
+        dut = AudioFIFOPeripheral(**kwargs)
+        decoder = csr.Decoder(addr_width=28, data_width=8)
+        decoder.add(dut.csr_bus, addr=0, name="dut")
+        bridge = wishbone.WishboneCSRBridge(decoder.bus, data_width=32)
+        m.submodules += [dut, decoder, bridge]
+
+        # Slow memory on the DMA bus. Each word reads back as its address.
+        bus = dut.dma_bus
+        count = Signal(range(self.DMA_LATENCY+1))
+        with m.If(bus.cyc & bus.stb & ~bus.ack & ~bus.err):
+            m.d.sync += count.eq(count + 1)
+            with m.If(count == self.DMA_LATENCY):
+                m.d.sync += count.eq(0)
+                with m.If(bus.adr >= self.ERR_ADR):
+                    m.d.sync += bus.err.eq(1)
+                with m.Else():
+                    m.d.sync += bus.ack.eq(1)
+        with m.Else():
+            m.d.sync += [
+                bus.ack.eq(0),
+                bus.err.eq(0),
+            ]
+        m.d.comb += bus.dat_r.eq(bus.adr)
+
+        return m, dut, bridge
+
+    def run_sim(self, m, dut, testbench, pushed, name):
+
+        # Record every frame pushed to the audio FIFO.
+        async def monitor(ctx):
+            w = dut._fifo.w_stream
+            async for _, _, valid, ready, payload in ctx.tick().sample(
+                    w.valid, w.ready, w.payload):
+                if valid and ready:
+                    pushed.append(payload)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_process(monitor)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"{name}.vcd", "w")):
+            sim.run()
+
+    def test_audio_fifo_dma(self):
+
+        m, dut, bridge = self.audio_fifo_dut(elastic_sz=16)
+        pushed = []
+
+        async def testbench(ctx):
+
+            async def csr_write(ctx, value, register, field=None):
+                await test_util.wb_csr_w(
+                        ctx, dut.csr_bus, bridge.wb_bus, value, register, field)
+
+            async def csr_read(ctx, register, field=None):
+                return await test_util.wb_csr_r(
+                        ctx, dut.csr_bus, bridge.wb_bus, register, field)
+
+            async def submit(addr, length):
+                await csr_write(ctx, addr, "dma_addr")
+                await csr_write(ctx, length, "dma_len")
+
+            # First block is taken by the DMA engine straight away.
+            await submit(0x100*4, 4)
+            self.assertEqual(await csr_read(ctx, "dma_busy"), 0)
+
+            # Second block is queued while the first is being copied.
+            await submit(0x200*4, 3)
+            self.assertEqual(await csr_read(ctx, "dma_busy"), 1)
+
+            # A third block is ignored while the queue slot is occupied.
+            await submit(0x300*4, 2)
+
+            await ctx.tick().repeat(10*self.DMA_LATENCY)
+            self.assertEqual(await csr_read(ctx, "dma_busy"), 0)
+            self.assertEqual(pushed, [0x100, 0x101, 0x102, 0x103,
+                                      0x200, 0x201, 0x202])
+            self.assertEqual(await csr_read(ctx, "dma_error"), 0)
+
+            # A bus error drops the rest of the block, and sets the
+            # sticky error flag until it is cleared.
+            pushed.clear()
+            await submit((self.ERR_ADR-1)*4, 4)
+            await ctx.tick().repeat(10*self.DMA_LATENCY)
+            self.assertEqual(pushed, [self.ERR_ADR-1])
+            self.assertEqual(await csr_read(ctx, "dma_busy"), 0)
+            # reading does not clear it.
+            self.assertEqual(await csr_read(ctx, "dma_error"), 1)
+            self.assertEqual(await csr_read(ctx, "dma_error"), 1)
+            await csr_write(ctx, 1, "dma_error")
+            self.assertEqual(await csr_read(ctx, "dma_error"), 0)
+
+            # DMA engine is still usable after an error.
+            pushed.clear()
+            await submit(0x400*4, 2)
+            await ctx.tick().repeat(5*self.DMA_LATENCY)
+            self.assertEqual(pushed, [0x400, 0x401])
+            self.assertEqual(await csr_read(ctx, "dma_error"), 0)
+
+        self.run_sim(m, dut, testbench, pushed, "test_audio_fifo_dma")
+
+    def test_audio_fifo_store_overflow(self):
+
+        elastic_sz = 4
+        m, dut, bridge = self.audio_fifo_dut(elastic_sz=elastic_sz)
+        pushed = []
+
+        async def testbench(ctx):
+
+            async def csr_write(ctx, value, register, field=None):
+                await test_util.wb_csr_w(
+                        ctx, dut.csr_bus, bridge.wb_bus, value, register, field)
+
+            async def csr_read(ctx, register, field=None):
+                return await test_util.wb_csr_r(
+                        ctx, dut.csr_bus, bridge.wb_bus, register, field)
+
+            wb = dut.wb_bus
+            ctx.set(wb.sel, 0b1111)
+            ctx.set(wb.we, 1)
+
+            async def store(frame):
+                ctx.set(wb.cyc, 1)
+                ctx.set(wb.stb, 1)
+                ctx.set(wb.dat_w, frame)
+                acked = ctx.get(wb.ack)
+                await ctx.tick()
+                ctx.set(wb.cyc, 0)
+                ctx.set(wb.stb, 0)
+                await ctx.tick()
+                return acked
+
+            # Stores are accepted until the FIFO is full.
+            for n in range(elastic_sz):
+                self.assertTrue(await store(0x10000 + n))
+            self.assertEqual(await csr_read(ctx, "overflow"), 0)
+            self.assertEqual(await csr_read(ctx, "fifo_len"), elastic_sz)
+
+            # A store to a full FIFO is stalled (not acknowledged, not
+            # dropped) and sets the overflow flag.
+            for _ in range(3):
+                self.assertFalse(await store(0xdead))
+            self.assertEqual(pushed, [0x10000 + n for n in range(elastic_sz)])
+
+            # Overflow flag is sticky until a 1 is written to it.
+            self.assertEqual(await csr_read(ctx, "overflow"), 1)
+            await csr_write(ctx, 0, "overflow")
+            self.assertEqual(await csr_read(ctx, "overflow"), 1)
+            await csr_write(ctx, 1, "overflow")
+            self.assertEqual(await csr_read(ctx, "overflow"), 0)
+
+        self.run_sim(m, dut, testbench, pushed, "test_audio_fifo_store_overflow")
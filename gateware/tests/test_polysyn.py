@@ -0,0 +1,106 @@
+# Copyright (c) 2024 Seb Holzapfel <me@sebholzapfel.com>
+#
+# SPDX-License-Identifier: CERN-OHL-S-2.0
+
+import unittest
+
+import math
+
+from amaranth              import *
+from amaranth.sim          import *
+
+from tiliqua.eurorack_pmod import ASQ
+from tiliqua               import midi
+
+from top.polysyn.top       import DriveShaperLUT, PolySynth, SynthPeripheral
+
+class PolySynTests(unittest.TestCase):
+
+    def test_drive_shaper_lut(self):
+
+        def scaled_tanh(x):
+            return math.tanh(3.0*x)
+
+        lut_size = 512
+        drive_init = 16384
+
+        m = Module()
+        m.submodules.dut = dut = DriveShaperLUT(
+            lut_function=scaled_tanh, lut_size=lut_size, drive_init=drive_init)
+
+        def lut_x(i):
+            # same layout as `dsp.WaveShaper.lut_memory`.
+            if i < lut_size//2:
+                return 2*i / lut_size
+            return 2*(i - lut_size) / lut_size
+
+        def check_lut(ctx, drive):
+            for i in range(lut_size):
+                fx = scaled_tanh(DriveShaperLUT.drive_clip(drive, lut_x(i)))
+                # max error includes the linear interpolation of the
+                # reference waveshaper between its own LUT entries.
+                y = ctx.get(dut.mem.data[i]) / 2**ASQ.f_width
+                self.assertAlmostEqual(y, fx, delta=0.001,
+                                       msg=f"drive={drive} i={i}")
+
+        async def testbench(ctx):
+            # LUT is valid out of reset, without any rebuild.
+            check_lut(ctx, drive_init)
+            for drive in [4096, 28000, drive_init]:
+                ctx.set(dut.drive, drive)
+                # generous upper bound on the rebuild time.
+                await ctx.tick().repeat(lut_size*16)
+                check_lut(ctx, drive)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open("test_drive_shaper_lut.vcd", "w")):
+            sim.run()
+
+    def test_voice_csr_back_to_back(self):
+
+        m = Module()
+        m.submodules.synth = synth = PolySynth()
+        m.submodules.dut = dut = SynthPeripheral(synth=synth)
+
+        notes = {0: (60, 100), 1: (67, 50)}
+
+        async def note_on(ctx, note, velocity):
+            ctx.set(dut.i_midi.payload.midi_type, midi.MessageType.NOTE_ON)
+            ctx.set(dut.i_midi.payload.midi_payload.note_on.note, note)
+            ctx.set(dut.i_midi.payload.midi_payload.note_on.velocity, velocity)
+            ctx.set(dut.i_midi.valid, 1)
+            await ctx.tick().until(dut.i_midi.ready)
+            ctx.set(dut.i_midi.valid, 0)
+            await ctx.tick().repeat(10)
+
+        async def testbench(ctx):
+            for note, velocity in notes.values():
+                await note_on(ctx, note, velocity)
+            # Read every byte of every voice register, with a read strobe on
+            # every cycle, so consecutive reads hit different voices.
+            addrs = [SynthPeripheral.VOICES_CSR_BASE + v*4 + b
+                     for v in range(PolySynth.N_VOICES) for b in range(2)]
+            data = []
+            ctx.set(dut.bus.r_stb, 1)
+            for addr in addrs:
+                ctx.set(dut.bus.addr, addr)
+                await ctx.tick()
+                data.append(ctx.get(dut.bus.r_data))
+            ctx.set(dut.bus.r_stb, 0)
+            for v in range(PolySynth.N_VOICES):
+                note, cutoff = data[2*v], data[2*v+1]
+                if v in notes:
+                    self.assertEqual(note, notes[v][0])
+                    self.assertNotEqual(cutoff, 0)
+                else:
+                    self.assertEqual((note, cutoff), (0, 0))
+            # different velocities, so the cutoffs must differ too.
+            self.assertNotEqual(data[1], data[3])
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open("test_voice_csr_back_to_back.vcd", "w")):
+            sim.run()
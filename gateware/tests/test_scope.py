@@ -0,0 +1,118 @@
+# Copyright (c) 2024 Seb Holzapfel <me@sebholzapfel.com>
+#
+# SPDX-License-Identifier: CERN-OHL-S-2.0
+
+import unittest
+
+from amaranth              import *
+from amaranth.sim          import *
+from amaranth_future       import fixed
+from tiliqua               import scope, test_util
+from tiliqua.eurorack_pmod import ASQ
+
+from amaranth_soc          import csr
+from amaranth_soc.csr      import wishbone
+
+class ScopeTests(unittest.TestCase):
+
+    def test_trace_peripheral_mode(self):
+
+        class FakeBusMaster:
+            addr_width = 30
+
+        class FakeBusDMA:
+            bus = FakeBusMaster()
+            def add_master(self, bus):
+                pass
+
+        m = Module()
+        dut = scope.TracePeripheral(
+            fb_base=0x0, fb_size=(1280, 720), bus_dma=FakeBusDMA())
+        decoder = csr.Decoder(addr_width=28, data_width=8)
+        decoder.add(dut.bus, addr=0, name="dut")
+        bridge = wishbone.WishboneCSRBridge(decoder.bus, data_width=32)
+        m.submodules += [dut, decoder, bridge]
+
+        # Framebuffer accesses from the strokes complete immediately.
+        for s in dut.strokes:
+            m.d.comb += s.bus.ack.eq(s.bus.cyc & s.bus.stb)
+
+        # Samples drawn by stroke 0, along with the mode they were drawn in.
+        drawn = []
+
+        async def monitor(ctx):
+            s0 = dut.strokes[0].i
+            vr = dut.vector_resample.o
+            async for _, _, mode, valid, ready, payload, vr_valid, vr_payload in ctx.tick().sample(
+                    dut.mode, s0.valid, s0.ready, s0.payload.as_value(),
+                    vr.valid, vr.payload.as_value()):
+                if valid and ready:
+                    drawn.append((mode, payload, vr_valid, vr_payload))
+
+        def ch(raw, n):
+            return (raw >> (n*ASQ.as_shape().width)) & 0xffff
+
+        async def testbench(ctx):
+
+            async def csr_write(ctx, value, register, field=None):
+                await test_util.wb_csr_w(
+                        ctx, dut.bus, bridge.wb_bus, value, register, field)
+
+            async def send(n_samples):
+                for n in range(n_samples):
+                    for c in range(4):
+                        ctx.set(dut.i.payload[c], fixed.Const(0.1*c + 0.01*(n % 8), shape=ASQ))
+                    ctx.set(dut.i.valid, 1)
+                    await ctx.tick().until(dut.i.ready)
+                    ctx.set(dut.i.valid, 0)
+                    await ctx.tick().repeat(50)
+
+            ctx.set(dut.en, 1)
+            await csr_write(ctx, 1, "en")
+            await csr_write(ctx, 100, "ypos0")
+            await csr_write(ctx, 200, "ypos1")
+
+            # Scope mode (default): stroke 0 draws ramp (X) against input
+            # channel 0 (Y), all strokes are enabled.
+            await send(16)
+            scope_drawn = [d for d in drawn if d[0] == scope.TracePeripheral.Mode.SCOPE]
+            self.assertGreater(len(scope_drawn), 0)
+            inputs_ch0 = {fixed.Const(0.01*(n % 8), shape=ASQ)._value & 0xffff for n in range(16)}
+            for _, payload, _, _ in scope_drawn:
+                self.assertIn(ch(payload, 1), inputs_ch0)
+            self.assertEqual([ctx.get(s.enable) for s in dut.strokes], [1, 1, 1, 1])
+            self.assertEqual(ctx.get(dut.strokes[0].y_offset), 100)
+            self.assertEqual(ctx.get(dut.strokes[1].y_offset), 200)
+
+            # Vector mode: stroke 0 draws the upsampled input, the other
+            # strokes are idle and the scope path sees no input.
+            drawn.clear()
+            await csr_write(ctx, 1, "mode")
+            await send(16)
+            self.assertGreater(len(drawn), 16)
+            for mode, payload, vr_valid, vr_payload in drawn:
+                self.assertEqual(mode, scope.TracePeripheral.Mode.VECTOR)
+                self.assertTrue(vr_valid)
+                self.assertEqual(payload, vr_payload)
+            self.assertEqual([ctx.get(s.enable) for s in dut.strokes], [1, 0, 0, 0])
+            self.assertEqual(ctx.get(dut.strokes[0].y_offset), 0)
+            self.assertEqual(ctx.get(dut.isplit4.i.valid), 0)
+
+            # Back to scope mode. The (stalled) vector path still holds its
+            # last output, which must not reach stroke 0.
+            drawn.clear()
+            await csr_write(ctx, 0, "mode")
+            await send(16)
+            self.assertGreater(len(drawn), 0)
+            for mode, payload, _, _ in drawn:
+                self.assertEqual(mode, scope.TracePeripheral.Mode.SCOPE)
+                self.assertIn(ch(payload, 1), inputs_ch0)
+            self.assertEqual([ctx.get(s.enable) for s in dut.strokes], [1, 1, 1, 1])
+            self.assertEqual(ctx.get(dut.strokes[0].y_offset), 100)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_process(monitor)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open("test_trace_peripheral_mode.vcd", "w")):
+            sim.run()